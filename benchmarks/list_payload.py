@@ -0,0 +1,40 @@
+from asyncio import run
+
+from sqlalchemy import select, func, desc, literal_column
+
+from server.database import async_session
+from server.tables import Article, Event
+
+
+COUNT_PAGE = 10
+COUNT_ITEM = 20
+
+
+async def page_bytes(session, order, columns, num_page: int) -> int:
+    page = (select(*columns)
+            .order_by(desc(order))
+            .offset((num_page - 1) * COUNT_ITEM)
+            .limit(COUNT_ITEM)
+            .subquery("q"))
+    response = select(func.coalesce(func.sum(func.pg_column_size(literal_column("q.*"))), 0)).select_from(page)
+    result = await session.execute(response)
+    return result.scalars().first()
+
+
+async def compare(session, table, order, skip: set[str]):
+    before = [i for i in table.__table__.columns]
+    after = [i for i in before if i.name not in skip]
+    print(f"{table.__tablename__}: page | bytes before | bytes after")
+    for num_page in range(1, COUNT_PAGE + 1):
+        size_before = await page_bytes(session, order, before, num_page)
+        size_after = await page_bytes(session, order, after, num_page)
+        print(f"{num_page} | {size_before} | {size_after}")
+
+
+async def main():
+    async with async_session() as session:
+        await compare(session, Article, Article.date_publications, {"description", "search_vector"})
+        await compare(session, Event, Event.date_conducting, {"description"})
+
+
+run(main())
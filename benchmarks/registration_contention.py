@@ -0,0 +1,92 @@
+from asyncio import run, gather
+from datetime import datetime, timedelta
+from time import perf_counter
+from uuid import uuid4
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, func, delete
+
+from server.main import app
+from server.database import async_session
+from server.service import LoginServices
+from server.tables import User, TypeUser, City, StateEvent, Event, UserToEvent, WaitList
+
+
+COUNT_USER = 300
+CAPACITY = 50
+MAX_P99 = 1.0
+
+
+async def setup() -> tuple[Event, list[User]]:
+    async with async_session() as session:
+        type_user = (await session.execute(select(TypeUser).where(TypeUser.name == "user"))).scalars().one()
+        city = (await session.execute(select(City))).scalars().first()
+        state = (await session.execute(select(StateEvent).where(StateEvent.name == "opened"))).scalars().one()
+        users = [User(email=f"bench-{uuid4()}@mail.ru", id_type=type_user.id) for _ in range(COUNT_USER)]
+        event = Event(date_conducting=datetime.now() + timedelta(days=1),
+                      date_stop=datetime.now() + timedelta(days=2),
+                      id_city=city.id,
+                      address="benchmark",
+                      name="benchmark",
+                      description_lite="",
+                      description=b"",
+                      capacity=CAPACITY,
+                      id_state=state.id)
+        session.add_all(users)
+        session.add(event)
+        await session.commit()
+        for user in users:
+            await session.refresh(user, ["type"])
+        return event, users
+
+
+async def cleanup(event: Event, users: list[User]):
+    async with async_session() as session:
+        await session.execute(delete(UserToEvent).where(UserToEvent.id_event == event.id))
+        await session.execute(delete(WaitList).where(WaitList.id_event == event.id))
+        await session.execute(delete(Event).where(Event.id == event.id))
+        await session.execute(delete(User).where(User.id.in_([i.id for i in users])))
+        await session.commit()
+
+
+async def register(client: AsyncClient, uuid_event: str, token: str) -> tuple[int, float]:
+    start = perf_counter()
+    response = await client.post(f"/v1/event/user_registration/{uuid_event}",
+                                 headers={"Authorization": f"Bearer {token}"})
+    return response.status_code, perf_counter() - start
+
+
+async def main():
+    event, users = await setup()
+    try:
+        tokens = [LoginServices.create_token(i).access_token for i in users]
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+            results = await gather(*[register(client, str(event.uuid), i) for i in tokens])
+
+        async with async_session() as session:
+            count_row = (await session.execute(
+                select(func.count()).where(UserToEvent.id_event == event.id))).scalars().first()
+            count_reg = (await session.execute(
+                select(Event.count_reg).where(Event.id == event.id))).scalars().first()
+            count_wait = (await session.execute(
+                select(func.count()).where(WaitList.id_event == event.id))).scalars().first()
+
+        statuses = [i[0] for i in results]
+        latency = sorted(i[1] for i in results)
+        p50 = latency[len(latency) // 2]
+        p99 = latency[min(len(latency) - 1, int(len(latency) * 0.99))]
+        print(f"requests: {COUNT_USER}, capacity: {CAPACITY}")
+        print(f"201: {statuses.count(201)}, 202: {statuses.count(202)}, "
+              f"other: {len(statuses) - statuses.count(201) - statuses.count(202)}")
+        print(f"user_to_event rows: {count_row}, event.count_reg: {count_reg}, wait_list rows: {count_wait}")
+        print(f"p50: {p50 * 1000:.1f} ms, p99: {p99 * 1000:.1f} ms")
+
+        assert count_row <= CAPACITY, "overbooked"
+        assert count_row == count_reg == statuses.count(201), "counter out of sync"
+        assert count_wait == statuses.count(202), "wait list out of sync"
+        assert p99 <= MAX_P99, "p99 latency too high"
+    finally:
+        await cleanup(event, users)
+
+
+run(main())
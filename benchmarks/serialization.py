@@ -0,0 +1,66 @@
+from datetime import datetime, date
+from timeit import timeit
+from types import SimpleNamespace
+from uuid import uuid4
+import json
+
+from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
+
+from server.models.Article import GetLiteArticle
+from server.models.Event import GetLiteEvent
+from server.models.User import UserGet
+from server.serialization import lite_article_list, lite_event_list, user_list
+
+
+COUNT_ITEM = 20
+NUMBER = 500
+
+
+def make_user():
+    return SimpleNamespace(uuid=uuid4(), email="user@mail.ru", id_type=1, name="Анна", surname="Иванова",
+                           patronymic="Петровна", phone="+79990000000", mood_emoji="😊", city="Москва",
+                           birth_date=date(1995, 5, 17), icon="account-icon-33.png",
+                           type=SimpleNamespace(id=1, name="user", description=""))
+
+
+def make_tags():
+    return [SimpleNamespace(id=i, name=f"тег {i}", description="описание") for i in range(3)]
+
+
+def make_article():
+    return SimpleNamespace(uuid=uuid4(), name="Статья", description_lite="Краткое описание" * 5, id_type=1,
+                           autor=make_user(), date_publications=datetime.now(),
+                           type=SimpleNamespace(id=1, name="новости", description=""), tags=make_tags())
+
+
+def make_event():
+    return SimpleNamespace(uuid=uuid4(), name="Событие", date_conducting=datetime.now(), date_stop=datetime.now(),
+                           id_city=1, address="ул. Ленина, 1", description_lite="Краткое описание" * 5,
+                           city=SimpleNamespace(id=1, name="Москва", region="Московская область"),
+                           tags=make_tags(), state=SimpleNamespace(id=1, name="opened", description=""))
+
+
+def current_path(model, adapter, rows):
+    items = [model.model_validate(i, from_attributes=True) for i in rows]
+    content = adapter.validate_python([i.model_dump() for i in items])
+    return json.dumps(jsonable_encoder(content)).encode("utf-8")
+
+
+def fast_path(model, adapter, rows):
+    return to_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def main():
+    print("model | current us/row | fast us/row")
+    for model, adapter, factory in [(GetLiteArticle, lite_article_list, make_article),
+                                    (GetLiteEvent, lite_event_list, make_event),
+                                    (UserGet, user_list, make_user)]:
+        rows = [factory() for _ in range(COUNT_ITEM)]
+        current = timeit(lambda: current_path(model, adapter, rows), number=NUMBER)
+        fast = timeit(lambda: fast_path(model, adapter, rows), number=NUMBER)
+        scale = 1_000_000 / (NUMBER * COUNT_ITEM)
+        print(f"{model.__name__} | {current * scale:.1f} | {fast * scale:.1f}")
+
+
+main()
@@ -1,5 +1,8 @@
 #!/bin/bash
 
+export WEB_CONCURRENCY=${WEB_CONCURRENCY:-4}
+
 alembic upgrade head
 python3 /app/create_model.py
-gunicorn server.main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8000
\ No newline at end of file
+python3 /app/reconcile_counters.py
+gunicorn server.main:app --workers $WEB_CONCURRENCY --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8000
@@ -0,0 +1,28 @@
+"""event date_update
+
+Revision ID: 0a4d6f8b2e93
+Revises: f16b7e2a4c58
+Create Date: 2026-10-18 18:16:47.280539
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a4d6f8b2e93'
+down_revision: Union[str, None] = 'f16b7e2a4c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('event', sa.Column('date_update', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index('ix_event_date_update', 'event', ['date_update'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_date_update', table_name='event')
+    op.drop_column('event', 'date_update')
@@ -0,0 +1,27 @@
+"""comment keyset index
+
+Revision ID: 0f2c8b5e7a19
+Revises: e4b7d2a81f6c
+Create Date: 2026-10-18 14:12:48.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f2c8b5e7a19'
+down_revision: Union[str, None] = 'e4b7d2a81f6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comment_id_article_date_publications', 'comment',
+                    ['id_article', 'date_publications', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comment_id_article_date_publications', table_name='comment')
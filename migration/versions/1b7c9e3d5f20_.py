@@ -0,0 +1,38 @@
+"""user autocomplete indexes
+
+Revision ID: 1b7c9e3d5f20
+Revises: 0a4d6f8b2e93
+Create Date: 2026-10-18 18:44:12.615093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7c9e3d5f20'
+down_revision: Union[str, None] = '0a4d6f8b2e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('user', sa.Column('full_name', sa.Text(), sa.Computed(
+        "lower(coalesce(surname, '') || ' ' || coalesce(name, '') || ' ' || coalesce(patronymic, ''))",
+        persisted=True
+    ), nullable=True))
+    op.create_index('ix_user_full_name_trgm', 'user', ['full_name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+    op.create_index('ix_user_email_pattern', 'user', [sa.text('lower(email) text_pattern_ops')], unique=False)
+    op.create_index('ix_user_phone_pattern', 'user', ['phone'], unique=False,
+                    postgresql_ops={'phone': 'text_pattern_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_phone_pattern', table_name='user')
+    op.drop_index('ix_user_email_pattern', table_name='user')
+    op.drop_index('ix_user_full_name_trgm', table_name='user')
+    op.drop_column('user', 'full_name')
@@ -0,0 +1,26 @@
+"""event duration index
+
+Revision ID: 2c4e8a1f6d37
+Revises: 1b7c9e3d5f20
+Create Date: 2026-10-18 19:12:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c4e8a1f6d37'
+down_revision: Union[str, None] = '1b7c9e3d5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_duration', 'event', [sa.text('(date_stop - date_conducting)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_duration', table_name='event')
@@ -0,0 +1,26 @@
+"""user_to_event event index
+
+Revision ID: 3c8e5f1a6b27
+Revises: 7d4e1b9c0a35
+Create Date: 2026-10-18 15:52:40.118350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e5f1a6b27'
+down_revision: Union[str, None] = '7d4e1b9c0a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_to_event_id_event_id_user', 'user_to_event', ['id_event', 'id_user'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_to_event_id_event_id_user', table_name='user_to_event')
@@ -0,0 +1,29 @@
+"""user calendar token
+
+Revision ID: 3d5f9b2a7e48
+Revises: 2c4e8a1f6d37
+Create Date: 2026-10-18 19:31:05.847261
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d5f9b2a7e48'
+down_revision: Union[str, None] = '2c4e8a1f6d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('calendar_token', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_unique_constraint('user_calendar_token_key', 'user', ['calendar_token'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('user_calendar_token_key', 'user', type_='unique')
+    op.drop_column('user', 'calendar_token')
@@ -0,0 +1,31 @@
+"""comment date_publications not null
+
+Revision ID: 4e6a0c3b8f59
+Revises: 3d5f9b2a7e48
+Create Date: 2026-10-18 20:05:41.392017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e6a0c3b8f59'
+down_revision: Union[str, None] = '3d5f9b2a7e48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE comment SET date_publications = coalesce("
+        "(SELECT article.date_publications FROM article WHERE article.id = comment.id_article), now()) "
+        "WHERE date_publications IS NULL"
+    )
+    op.alter_column('comment', 'date_publications', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('comment', 'date_publications', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,26 @@
+"""article keyset index
+
+Revision ID: 5c1e9a7d3b42
+Revises: daa6e1a8d940
+Create Date: 2026-10-18 10:02:11.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d3b42'
+down_revision: Union[str, None] = 'daa6e1a8d940'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_article_date_publications_id', 'article', ['date_publications', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_article_date_publications_id', table_name='article')
@@ -0,0 +1,28 @@
+"""article and event row version
+
+Revision ID: 7d4e1b9c0a35
+Revises: 0f2c8b5e7a19
+Create Date: 2026-10-18 15:31:22.604713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4e1b9c0a35'
+down_revision: Union[str, None] = '0f2c8b5e7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('article', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('event', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('event', 'version')
+    op.drop_column('article', 'version')
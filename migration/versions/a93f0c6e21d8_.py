@@ -0,0 +1,58 @@
+"""article full text search
+
+Revision ID: a93f0c6e21d8
+Revises: 5c1e9a7d3b42
+Create Date: 2026-10-18 11:24:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93f0c6e21d8'
+down_revision: Union[str, None] = '5c1e9a7d3b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('russian', coalesce({row}name, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce({row}description_lite, '')), 'B') ||
+    setweight(to_tsvector('russian', regexp_replace(
+        coalesce(convert_from({row}description, 'UTF8'), ''), '<[^>]+>', ' ', 'g'
+    )), 'C')
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('article', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(f"""
+        CREATE FUNCTION article_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER article_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, description_lite, description ON article
+        FOR EACH ROW EXECUTE FUNCTION article_search_vector_update()
+    """)
+    op.execute(f"UPDATE article SET search_vector = {SEARCH_VECTOR.format(row='')}")
+    op.create_index('ix_article_search_vector', 'article', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_article_name_trgm', 'article', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_article_name_trgm', table_name='article')
+    op.drop_index('ix_article_search_vector', table_name='article')
+    op.execute("DROP TRIGGER article_search_vector_trigger ON article")
+    op.execute("DROP FUNCTION article_search_vector_update()")
+    op.drop_column('article', 'search_vector')
@@ -0,0 +1,33 @@
+"""event capacity and registration counter
+
+Revision ID: b61d0e4f2c83
+Revises: 3c8e5f1a6b27
+Create Date: 2026-10-18 16:14:05.472918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61d0e4f2c83'
+down_revision: Union[str, None] = '3c8e5f1a6b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('event', sa.Column('capacity', sa.Integer(), nullable=True))
+    op.add_column('event', sa.Column('count_reg', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE event SET count_reg = reg.count
+        FROM (SELECT id_event, count(*) AS count FROM user_to_event GROUP BY id_event) AS reg
+        WHERE reg.id_event = event.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('event', 'count_reg')
+    op.drop_column('event', 'capacity')
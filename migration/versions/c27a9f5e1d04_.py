@@ -0,0 +1,37 @@
+"""event wait list
+
+Revision ID: c27a9f5e1d04
+Revises: b61d0e4f2c83
+Create Date: 2026-10-18 16:40:18.935201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27a9f5e1d04'
+down_revision: Union[str, None] = 'b61d0e4f2c83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('wait_list',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_event', sa.Integer(), nullable=False),
+    sa.Column('id_user', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['id_event'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['id_user'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_event', 'id_user')
+    )
+    op.create_index('ix_wait_list_id_event_id', 'wait_list', ['id_event', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_wait_list_id_event_id', table_name='wait_list')
+    op.drop_table('wait_list')
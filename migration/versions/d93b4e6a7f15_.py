@@ -0,0 +1,28 @@
+"""event date range indexes
+
+Revision ID: d93b4e6a7f15
+Revises: c27a9f5e1d04
+Create Date: 2026-10-18 17:02:51.307664
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93b4e6a7f15'
+down_revision: Union[str, None] = 'c27a9f5e1d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_date_conducting_id', 'event', ['date_conducting', 'id'], unique=False)
+    op.create_index('ix_event_id_city_date_conducting_id', 'event', ['id_city', 'date_conducting', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_id_city_date_conducting_id', table_name='event')
+    op.drop_index('ix_event_date_conducting_id', table_name='event')
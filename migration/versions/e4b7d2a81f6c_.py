@@ -0,0 +1,31 @@
+"""article likes counter
+
+Revision ID: e4b7d2a81f6c
+Revises: a93f0c6e21d8
+Create Date: 2026-10-18 12:40:05.117342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d2a81f6c'
+down_revision: Union[str, None] = 'a93f0c6e21d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('article', sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE article SET likes_count = c.count
+        FROM (SELECT id_article, count(*) AS count FROM "like" GROUP BY id_article) AS c
+        WHERE article.id = c.id_article
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('article', 'likes_count')
@@ -0,0 +1,26 @@
+"""event date_stop index
+
+Revision ID: e5a8c3d09b61
+Revises: d93b4e6a7f15
+Create Date: 2026-10-18 17:25:09.846112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a8c3d09b61'
+down_revision: Union[str, None] = 'd93b4e6a7f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_date_stop', 'event', ['date_stop'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_date_stop', table_name='event')
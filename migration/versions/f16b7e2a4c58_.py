@@ -0,0 +1,34 @@
+"""event trigram search indexes
+
+Revision ID: f16b7e2a4c58
+Revises: e5a8c3d09b61
+Create Date: 2026-10-18 17:48:33.521870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f16b7e2a4c58'
+down_revision: Union[str, None] = 'e5a8c3d09b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_event_name_trgm', 'event', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_event_address_trgm', 'event', ['address'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'address': 'gin_trgm_ops'})
+    op.create_index('ix_event_description_lite_trgm', 'event', ['description_lite'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'description_lite': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_description_lite_trgm', table_name='event')
+    op.drop_index('ix_event_address_trgm', table_name='event')
+    op.drop_index('ix_event_name_trgm', table_name='event')
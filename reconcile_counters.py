@@ -0,0 +1,31 @@
+from asyncio import run
+from server.database import async_session
+from server.repositories import ArticleRepository, EventRepository
+
+
+async def reconcile_likes_count():
+    async with async_session() as session:
+        try:
+            repo = ArticleRepository(session)
+            count = await repo.reconcile_likes_count()
+            print(f"article.likes_count fixed: {count}")
+        finally:
+            await session.close()
+
+
+async def reconcile_count_reg():
+    async with async_session() as session:
+        try:
+            repo = EventRepository(session)
+            count = await repo.reconcile_count_reg()
+            print(f"event.count_reg fixed: {count}")
+        finally:
+            await session.close()
+
+
+async def main():
+    await reconcile_likes_count()
+    await reconcile_count_reg()
+
+
+run(main())
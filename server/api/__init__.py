@@ -5,6 +5,7 @@ from .env import router as env_router
 from .article import router as article_router
 from .event import router as event_router
 from .calendar import router as calendar_router
+from .cache import router as cache_router
 
 router = APIRouter(prefix="/v1")
 router.include_router(login_router)
@@ -12,4 +13,5 @@ router.include_router(user_router)
 router.include_router(env_router)
 router.include_router(article_router)
 router.include_router(event_router)
-router.include_router(calendar_router)
\ No newline at end of file
+router.include_router(calendar_router)
+router.include_router(cache_router)
\ No newline at end of file
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, status, Request, Response
 from fastapi.responses import JSONResponse
 
 from ..service import get_current_user, ArticleService
+from ..response_cache import response_cache, is_not_modified
 from ..models.Message import Message
 from ..models.User import UserGet
 from ..models.Article import *
@@ -39,12 +40,20 @@ async def create_article(target: PostArticle,
     status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
     status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
 }, response_model=GetArticle)
-async def get_one_article(uuid: str,
+async def get_one_article(request: Request,
+                          uuid: str,
                           service: ArticleService = Depends(),
                           ):
-    article = await service.get_article(uuid)
-    if article is not None:
-        return article
+    version = await service.get_article_version(uuid)
+    if version is not None:
+        etag = f'"{uuid}-{version}"'
+        if is_not_modified(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        cached = await response_cache.get(request)
+        if cached is not None and cached.headers.get("etag") == etag:
+            return cached
+        article = await service.get_article(uuid)
+        return await response_cache.set(request, article, {"ETag": etag}, [f"article:{uuid}"])
     else:
         return JSONResponse(content={"message": "статьи не существует"},
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -52,20 +61,49 @@ async def get_one_article(uuid: str,
 
 @router.get("/page", response_model=list[GetLiteArticle],
             responses={
+                status.HTTP_400_BAD_REQUEST: {"model": Message},
                 status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
                 status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
                 status.HTTP_200_OK: {"model": Message}
             })
-async def get_page_article(response: Response,
+async def get_page_article(request: Request,
                            page: int = 1,
+                           cursor: str | None = None,
                            tags: str | None = None,
                            type_article: int | None = None,
                            service: ArticleService = Depends()):
-    count_page = await service.get_count_page(tags, type_article)
-    response.headers["X-Count-Page"] = str(count_page)
-    response.headers["X-Count-Item"] = str(service.count_item)
-    articles = await service.get_page_article(page, tags, type_article)
-    return articles
+    cached = await response_cache.get(request)
+    if cached is not None:
+        return cached
+    headers = {"X-Count-Item": str(service.count_item)}
+    if cursor is not None:
+        try:
+            articles, next_cursor = await service.get_page_article_by_cursor(cursor, tags, type_article)
+        except ValueError:
+            return JSONResponse(content={"message": "неверный курсор"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+        return await response_cache.set(request, articles, headers, ["article"])
+
+    articles, count_page = await service.get_page_with_count(page, tags, type_article)
+    headers["X-Count-Page"] = str(count_page)
+    return await response_cache.set(request, articles, headers, ["article"])
+
+
+@router.get("/facets", response_model=ArticleFacets,
+            responses={
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_facets(request: Request,
+                     tags: str | None = None,
+                     type_article: int | None = None,
+                     service: ArticleService = Depends()):
+    cached = await response_cache.get(request)
+    if cached is not None:
+        return cached
+    facets = await service.get_facets(tags, type_article)
+    return await response_cache.set(request, facets, {}, ["article"])
 
 
 @router.get("/search", response_model=list[GetLiteArticle],
@@ -83,6 +121,7 @@ async def get_article_by_search(search_field: str,
 
 
 @router.delete("/{uuid}", responses={
+            status.HTTP_400_BAD_REQUEST: {"model": Message},
             status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
             status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
             status.HTTP_200_OK: {"model": Message}
@@ -95,6 +134,33 @@ async def delete_article(uuid: str,
             await service.delete_article(uuid)
             return JSONResponse(status_code=status.HTTP_200_OK,
                                 content={"message": "Удалено"})
+        except ValueError:
+            return JSONResponse(content={"message": "неверный идентификатор"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        except Exception:
+            return JSONResponse(content={"message": "ошибка обновления"},
+                                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    else:
+        return message_error[status.HTTP_406_NOT_ACCEPTABLE]
+
+
+@router.delete("", responses={
+            status.HTTP_400_BAD_REQUEST: {"model": Message},
+            status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+            status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
+            status.HTTP_200_OK: {"model": Message}
+})
+async def delete_article_list(uuid_articles: str,
+                              service: ArticleService = Depends(),
+                              current_user: UserGet = Depends(get_current_user)):
+    if current_user.type.name == "admin":
+        try:
+            await service.delete_article_list(uuid_articles)
+            return JSONResponse(status_code=status.HTTP_200_OK,
+                                content={"message": "Удалено"})
+        except ValueError:
+            return JSONResponse(content={"message": "неверный идентификатор"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
         except Exception:
             return JSONResponse(content={"message": "ошибка обновления"},
                                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -137,15 +203,48 @@ async def get_commentary(uuid: str,
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@router.get("/commentary/{uuid}/page", responses={
+    status.HTTP_400_BAD_REQUEST: {"model": Message},
+    status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+    status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+}, response_model=list[GetLiteCommentary])
+async def get_commentary_page(request: Request,
+                              uuid: str,
+                              cursor: str = "",
+                              service: ArticleService = Depends(),
+                              ):
+    cached = await response_cache.get(request, shared_only=True)
+    if cached is not None:
+        return cached
+    try:
+        comments, next_cursor = await service.get_commentary_by_cursor(uuid, cursor)
+    except ValueError:
+        return JSONResponse(content={"message": "неверный курсор"},
+                            status_code=status.HTTP_400_BAD_REQUEST)
+    headers = {"X-Count-Item": str(service.count_item)}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    return await response_cache.set(request, comments, headers, [f"comment:{uuid}"], shared_only=True)
+
+
 @router.get("/like/{uuid_article}", responses={
     status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
     status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
 }, response_model=LikeInfo)
-async def get_like_info(uuid_article: str,
+async def get_like_info(request: Request,
+                        uuid_article: str,
                         uuid_user: str | None = None,
                         service: ArticleService = Depends(),
                         ):
-    like = await service.get_like_info(uuid_article, uuid_user)
+    if uuid_user is None or uuid_user == "no":
+        cached = await response_cache.get(request, shared_only=True)
+        if cached is not None:
+            return cached
+        like = await service.get_like_info(uuid_article, "no")
+        if like is not None:
+            return await response_cache.set(request, like, {}, [f"like:{uuid_article}"], shared_only=True)
+    else:
+        like = await service.get_like_info(uuid_article, uuid_user)
     if like is not None:
         return like
     else:
@@ -153,7 +252,28 @@ async def get_like_info(uuid_article: str,
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@router.get("/like_list", responses={
+    status.HTTP_400_BAD_REQUEST: {"model": Message},
+    status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+    status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+}, response_model=list[ArticleLikeInfo])
+async def get_like_info_list(uuid_articles: str,
+                             uuid_user: str | None = None,
+                             service: ArticleService = Depends(),
+                             ):
+    try:
+        likes = await service.get_like_info_list(uuid_articles, uuid_user)
+        return likes
+    except ValueError:
+        return JSONResponse(content={"message": "неверный идентификатор"},
+                            status_code=status.HTTP_400_BAD_REQUEST)
+    except Exception:
+        return JSONResponse(content={"message": "ошибка получения"},
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @router.post("/like/{uuid_article}", responses={
+    status.HTTP_400_BAD_REQUEST: {"model": Message},
     status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
     status.HTTP_201_CREATED: {"model": Message},
     status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
@@ -166,12 +286,16 @@ async def add_like(uuid_article: str,
         await service.add_like(uuid_article, current_user.uuid)
         return JSONResponse(content={"message": "добавлено"},
                             status_code=status.HTTP_201_CREATED)
+    except ValueError:
+        return JSONResponse(content={"message": "неверный идентификатор"},
+                            status_code=status.HTTP_400_BAD_REQUEST)
     except Exception:
         return JSONResponse(content={"message": "ошибка добавления"},
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @router.delete("/like/{uuid_article}", responses={
+            status.HTTP_400_BAD_REQUEST: {"model": Message},
             status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
             status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
             status.HTTP_200_OK: {"model": Message}
@@ -184,6 +308,9 @@ async def delete_like(uuid_article: str,
         await service.delete_like(uuid_article, current_user.uuid)
         return JSONResponse(status_code=status.HTTP_200_OK,
                             content={"message": "Удалено"})
+    except ValueError:
+        return JSONResponse(content={"message": "неверный идентификатор"},
+                            status_code=status.HTTP_400_BAD_REQUEST)
     except Exception:
         return JSONResponse(content={"message": "ошибка обновления"},
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
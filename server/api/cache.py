@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from ..service import get_current_user
+from ..models.Message import Message
+from ..models.User import UserGet
+from ..models.Cache import CacheMetrics
+from ..response_cache import response_cache
+
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+message_error = {
+    status.HTTP_406_NOT_ACCEPTABLE: JSONResponse(content={"message": "отказ в доступе"},
+                                                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+}
+
+
+@router.get("/metrics", responses={
+    status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+    status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+}, response_model=CacheMetrics)
+async def get_cache_metrics(current_user: UserGet = Depends(get_current_user)):
+    if current_user.type.name == "admin":
+        return CacheMetrics(**response_cache.metrics())
+    else:
+        return message_error[status.HTTP_406_NOT_ACCEPTABLE]
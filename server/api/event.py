@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, status, Response
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, status, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..service import get_current_user, EventService
+from ..response_cache import response_cache, is_not_modified
 from ..models.Message import Message
 from ..models.User import UserGet
 from ..models.Event import *
+from datetime import datetime, timezone
+from email.utils import format_datetime
 
 
 router = APIRouter(prefix="/event", tags=["event"])
@@ -49,12 +52,20 @@ async def create_event(target: PostEvent,
     status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
     status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
 }, response_model=GetEvent)
-async def get_one_event(uuid: str,
+async def get_one_event(request: Request,
+                        uuid: str,
                         service: EventService = Depends(),
                         ):
-    event = await service.get_event(uuid)
-    if event is not None:
-        return event
+    version = await service.get_event_version(uuid)
+    if version is not None:
+        etag = f'"{uuid}-{version}"'
+        if is_not_modified(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        cached = await response_cache.get(request)
+        if cached is not None and cached.headers.get("etag") == etag:
+            return cached
+        event = await service.get_event(uuid)
+        return await response_cache.set(request, event, {"ETag": etag}, [f"event:{uuid}"])
     else:
         return JSONResponse(content={"message": "статьи не существует"},
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -66,16 +77,153 @@ async def get_one_event(uuid: str,
                 status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
                 status.HTTP_200_OK: {"model": Message}
             })
-async def get_page_event(response: Response,
+async def get_page_event(request: Request,
                          page: int = 1,
                          tags: str | None = None,
                          city: int | None = None,
                          service: EventService = Depends()):
-    count_page = await service.get_count_page(tags, city)
-    response.headers["X-Count-Page"] = str(count_page)
-    response.headers["X-Count-Item"] = str(service.count_item)
-    events = await service.get_page_event(page, tags, city)
-    return events
+    cached = await response_cache.get(request)
+    if cached is not None:
+        return cached
+    events, count_page = await service.get_page_with_count(page, tags, city)
+    headers = {
+        "X-Count-Page": str(count_page),
+        "X-Count-Item": str(service.count_item)
+    }
+    return await response_cache.set(request, events, headers, ["event"])
+
+
+@router.get("/facets", response_model=EventFacets,
+            responses={
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_facets(request: Request,
+                     tags: str | None = None,
+                     city: int | None = None,
+                     service: EventService = Depends()):
+    cached = await response_cache.get(request)
+    if cached is not None:
+        return cached
+    facets = await service.get_facets(tags, city)
+    return await response_cache.set(request, facets, {}, ["event"])
+
+
+async def calendar_response(request: Request,
+                            service: EventService,
+                            name: str,
+                            city: int | None,
+                            uuid_user: str | None) -> Response:
+    count, checksum, date_update = await service.get_calendar_stamp(city, uuid_user)
+    headers = {}
+    if date_update is not None:
+        date_update = date_update.astimezone(timezone.utc).replace(microsecond=0)
+        headers["Last-Modified"] = format_datetime(date_update, usegmt=True)
+        headers["ETag"] = f'"{count}-{checksum}-{int(date_update.timestamp())}"'
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Disposition"] = 'inline; filename="events.ics"'
+    return StreamingResponse(service.stream_calendar(name, city, uuid_user),
+                             media_type="text/calendar",
+                             headers=headers)
+
+
+@router.get("/ics", response_class=StreamingResponse,
+            responses={
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_calendar(request: Request,
+                       city: int | None = None,
+                       service: EventService = Depends()):
+    return await calendar_response(request, service, "События", city, None)
+
+
+@router.get("/ics/user", response_class=StreamingResponse,
+            responses={
+                status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_calendar_by_user(request: Request,
+                               service: EventService = Depends(),
+                               current_user: UserGet = Depends(get_current_user)):
+    return await calendar_response(request, service, "Мои события", None, str(current_user.uuid))
+
+
+@router.get("/ics/token", response_model=CalendarToken,
+            responses={
+                status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_calendar_token(service: EventService = Depends(),
+                             current_user: UserGet = Depends(get_current_user)):
+    try:
+        return await service.get_calendar_token(current_user)
+    except Exception:
+        return JSONResponse(content={"message": "ошибка обновления"},
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@router.post("/ics/token", response_model=CalendarToken,
+             responses={
+                 status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+                 status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+             })
+async def rotate_calendar_token(service: EventService = Depends(),
+                                current_user: UserGet = Depends(get_current_user)):
+    try:
+        return await service.get_calendar_token(current_user, rotate=True)
+    except Exception:
+        return JSONResponse(content={"message": "ошибка обновления"},
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@router.get("/ics/user/{token}", response_class=StreamingResponse,
+            responses={
+                status.HTTP_404_NOT_FOUND: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_calendar_by_token(request: Request,
+                                token: str,
+                                service: EventService = Depends()):
+    uuid_user = await service.get_uuid_user_by_calendar_token(token)
+    if uuid_user is None:
+        return JSONResponse(content={"message": "календарь не найден"},
+                            status_code=status.HTTP_404_NOT_FOUND)
+    response = await calendar_response(request, service, "Мои события", None, uuid_user)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@router.get("/range", response_model=list[GetLiteEvent],
+            responses={
+                status.HTTP_400_BAD_REQUEST: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
+                status.HTTP_200_OK: {"model": Message}
+            })
+async def get_range_event(request: Request,
+                          date_from: datetime,
+                          date_to: datetime,
+                          city: int | None = None,
+                          cursor: str = "",
+                          service: EventService = Depends()):
+    if date_from.tzinfo is None:
+        date_from = date_from.replace(tzinfo=timezone.utc)
+    if date_to.tzinfo is None:
+        date_to = date_to.replace(tzinfo=timezone.utc)
+    if date_from > date_to:
+        return JSONResponse(content={"message": "неверный интервал"},
+                            status_code=status.HTTP_400_BAD_REQUEST)
+    cached = await response_cache.get(request)
+    if cached is not None:
+        return cached
+    try:
+        events, next_cursor = await service.get_range_event(date_from, date_to, city, cursor)
+    except ValueError:
+        return JSONResponse(content={"message": "неверный курсор"},
+                            status_code=status.HTTP_400_BAD_REQUEST)
+    headers = {"X-Count-Item": str(service.count_item)}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    return await response_cache.set(request, events, headers, ["event"])
 
 
 @router.get("/search", response_model=list[GetLiteEvent],
@@ -86,9 +234,12 @@ async def get_page_event(response: Response,
             })
 async def get_event_by_search(search_field: str,
                               count: int = 5,
+                              city: int | None = None,
+                              date_from: datetime | None = None,
+                              date_to: datetime | None = None,
                               service: EventService = Depends(),
                               ):
-    events = await service.get_event_by_search(search_field, count)
+    events = await service.get_event_by_search(search_field, count, city, date_from, date_to)
     return events
 
 
@@ -151,6 +302,7 @@ async def get_user_registration_info(uuid_event: str,
 @router.post("/user_registration/{uuid_event}", responses={
     status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
     status.HTTP_201_CREATED: {"model": Message},
+    status.HTTP_202_ACCEPTED: {"model": Message},
     status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
 })
 async def add_user_reg(uuid_event: str,
@@ -158,12 +310,16 @@ async def add_user_reg(uuid_event: str,
                        current_user: UserGet = Depends(get_current_user)
                        ):
     try:
-        await service.add_user_reg(uuid_event, current_user.uuid)
-        return JSONResponse(content={"message": "добавлено"},
-                            status_code=status.HTTP_201_CREATED)
+        reg_state = await service.add_user_reg(uuid_event, current_user.uuid)
     except Exception:
         return JSONResponse(content={"message": "ошибка добавления"},
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if reg_state == "registered":
+        return JSONResponse(content={"message": "добавлено"},
+                            status_code=status.HTTP_201_CREATED)
+    else:
+        return JSONResponse(content={"message": "добавлено в лист ожидания"},
+                            status_code=status.HTTP_202_ACCEPTED)
 
 
 @router.delete("/user_registration/{uuid_event}", responses={
@@ -188,14 +344,19 @@ async def delete_user_reg(uuid_event: str,
             status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
             status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
 }, response_model=list[UserGet])
-async def delete_user_reg(uuid_event: str,
+async def delete_user_reg(response: Response,
+                          uuid_event: str,
                           uuid_user: str,
+                          page: int = 1,
                           service: EventService = Depends(),
                           current_user: UserGet = Depends(get_current_user)):
     if current_user.type.name == "admin":
         try:
-            t = await service.delete_user_reg(uuid_event, uuid_user)
-            return t
+            await service.delete_user_reg(uuid_event, uuid_user)
+            count_page = await service.get_count_page_user_reg(uuid_event)
+            response.headers["X-Count-Page"] = str(count_page)
+            response.headers["X-Count-Item"] = str(service.count_item)
+            return await service.get_page_user_reg(uuid_event, page)
         except Exception:
             return JSONResponse(content={"message": "ошибка обновления"},
                                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -203,6 +364,62 @@ async def delete_user_reg(uuid_event: str,
         return message_error[status.HTTP_406_NOT_ACCEPTABLE]
 
 
+@router.get("/export", response_class=StreamingResponse,
+            responses={
+                status.HTTP_400_BAD_REQUEST: {"model": Message},
+                status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def export_user_reg(uuid_events: str,
+                          file_format: str = "csv",
+                          service: EventService = Depends(),
+                          current_user: UserGet = Depends(get_current_user)):
+    if current_user.type.name == "admin":
+        if file_format not in ["csv", "xlsx"]:
+            return JSONResponse(content={"message": "неверный формат"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        try:
+            content = service.export_user_reg(uuid_events, file_format)
+        except ValueError:
+            return JSONResponse(content={"message": "неверный идентификатор"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        except ImportError:
+            return JSONResponse(content={"message": "формат недоступен"},
+                                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if file_format == "xlsx":
+            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        else:
+            media_type = "text/csv"
+        return StreamingResponse(content,
+                                 media_type=media_type,
+                                 headers={
+                                     "Content-Disposition": f'attachment; filename="registrants.{file_format}"',
+                                     "Cache-Control": "no-store"
+                                 })
+    else:
+        return message_error[status.HTTP_406_NOT_ACCEPTABLE]
+
+
+@router.get("/{uuid}/users", response_model=list[UserGet],
+            responses={
+                status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message}
+            })
+async def get_page_user_reg(response: Response,
+                            uuid: str,
+                            page: int = 1,
+                            service: EventService = Depends(),
+                            current_user: UserGet = Depends(get_current_user)):
+    if current_user.type.name == "admin":
+        count_page = await service.get_count_page_user_reg(uuid)
+        response.headers["X-Count-Page"] = str(count_page)
+        response.headers["X-Count-Item"] = str(service.count_item)
+        users = await service.get_page_user_reg(uuid, page)
+        return users
+    else:
+        return message_error[status.HTTP_406_NOT_ACCEPTABLE]
+
+
 @router.get("/page/by_user", response_model=list[GetLiteEvent],
             responses={
                 status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
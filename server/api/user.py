@@ -6,6 +6,7 @@ from starlette.templating import Jinja2Templates
 from ..service import UserService, get_current_user
 from ..models.Message import Message
 from ..models.User import UserGet, UserPost, GetTypeUser, UserUpdate, PasswordUpdate
+from ..serialization import json_response
 
 
 router = APIRouter(prefix="/user", tags=["user"])
@@ -75,10 +76,11 @@ async def get_page_user(response: Response,
                         user_service: UserService = Depends()):
     if current_user.type.name == "admin":
         count_page = await user_service.get_count_page()
-        response.headers["X-Count-Page"] = str(count_page)
-        response.headers["X-Count-Item"] = str(user_service.count_item)
         users = await user_service.get_page_user(page)
-        return users
+        return json_response(users, {
+            "X-Count-Page": str(count_page),
+            "X-Count-Item": str(user_service.count_item)
+        })
     else:
         return message_error[status.HTTP_406_NOT_ACCEPTABLE]
 
@@ -98,6 +100,21 @@ async def get_users_by_search(search_field: str,
     return users
 
 
+@router.get("/autocomplete", response_model=list[UserGet],
+            responses={
+                status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
+                status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
+                status.HTTP_200_OK: {"model": Message}
+            })
+async def get_users_by_autocomplete(search_field: str,
+                                    count: int = 5,
+                                    user_service: UserService = Depends(),
+                                    current_user: UserGet = Depends(get_current_user)
+                                    ):
+    users = await user_service.get_users_by_autocomplete(search_field, count)
+    return users
+
+
 @router.put("/{uuid}", responses={
             status.HTTP_406_NOT_ACCEPTABLE: {"model": Message},
             status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": Message},
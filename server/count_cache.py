@@ -0,0 +1,33 @@
+from time import monotonic
+
+from .settings import settings
+
+
+class CountCache:
+    def __init__(self, ttl: int):
+        self.__ttl: int = ttl
+        self.__items: dict[str, dict[tuple, tuple[float, int]]] = {}
+
+    def get(self, namespace: str, key: tuple) -> int | None:
+        item = self.__items.get(namespace, {}).get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < monotonic():
+            del self.__items[namespace][key]
+            return None
+        return value
+
+    def set(self, namespace: str, key: tuple, value: int):
+        self.__items.setdefault(namespace, {})[key] = (monotonic() + self.__ttl, value)
+
+    def invalidate(self, namespace: str):
+        self.__items.pop(namespace, None)
+
+
+def filter_key(tags_list: list[int] | None, *args) -> tuple:
+    tags = tuple(sorted(set(tags_list))) if tags_list is not None else None
+    return (tags, *args)
+
+
+count_cache = CountCache(settings.count_cache_ttl)
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+
+def escape_text(value: str | None) -> str:
+    if value is None:
+        return ""
+    return (value.replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\r\n", "\\n")
+            .replace("\n", "\\n"))
+
+
+def format_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def fold_line(line: str) -> str:
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append(current)
+            current = ""
+            size = 0
+            limit = 74
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def calendar_begin(name: str) -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//MamPortal//Events//RU",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    return "".join(fold_line(i) for i in lines).encode("utf-8")
+
+
+def calendar_end() -> bytes:
+    return fold_line("END:VCALENDAR").encode("utf-8")
+
+
+def format_event(uuid, name: str, date_conducting: datetime, date_stop: datetime, date_update: datetime,
+                 city: str | None, address: str, description_lite: str) -> bytes:
+    location = ", ".join(i for i in [city, address] if i)
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uuid}@mamportal",
+        f"DTSTAMP:{format_date(date_update)}",
+        f"LAST-MODIFIED:{format_date(date_update)}",
+        f"DTSTART:{format_date(date_conducting)}",
+        f"DTEND:{format_date(date_stop)}",
+        f"SUMMARY:{escape_text(name)}",
+        f"LOCATION:{escape_text(location)}",
+        f"DESCRIPTION:{escape_text(description_lite)}",
+        "END:VEVENT",
+    ]
+    return "".join(fold_line(i) for i in lines).encode("utf-8")
@@ -8,6 +8,7 @@ from .api import router
 from .settings import settings
 
 from .repositories import UserRepository
+from .service import like_buffer, wait_list_promoter, event_scheduler
 from .database import async_session
 from .tables import User, TypeUser
 
@@ -19,7 +20,20 @@ from .tables import User, TypeUser
 
 origins = ["*"]
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.like_write_behind:
+        like_buffer.start()
+    wait_list_promoter.start()
+    event_scheduler.start()
+    yield
+    await event_scheduler.stop()
+    await wait_list_promoter.stop()
+    await like_buffer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,7 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Count-Page", "X-Count-Item"],
+    expose_headers=["X-Count-Page", "X-Count-Item", "X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 app.include_router(router)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4, field_serializer
-from .Env import GetTag, GetTypeArticle
+from .Env import GetTag, GetTypeArticle, FacetCount
 from .User import UserGet
 from datetime import datetime
 
@@ -56,10 +56,50 @@ class GetCommentary(BaseModel):
         return str(uuid)
 
 
+class GetCommentAuthor(BaseModel):
+    uuid: UUID4
+    name: str | None
+    surname: str | None
+    icon: str | None
+
+    @field_serializer('uuid')
+    def serialize_uuid(self, uuid: UUID4, _info):
+        return str(uuid)
+
+    @field_serializer('icon')
+    def serialize_icon(self, icon: str, _info):
+        return f"http://localhost:9000/icon/{icon}"
+
+
+class GetLiteCommentary(BaseModel):
+    uuid: UUID4
+    user: GetCommentAuthor
+    content: str
+    date_publications: datetime
+
+    @field_serializer('uuid')
+    def serialize_uuid(self, uuid: UUID4, _info):
+        return str(uuid)
+
+
 class LikeInfo(BaseModel):
     count: int
     youLike: bool
 
 
+class ArticleLikeInfo(LikeInfo):
+    uuid: UUID4
+
+    @field_serializer('uuid')
+    def serialize_uuid(self, uuid: UUID4, _info):
+        return str(uuid)
+
+
 class PostComment(BaseModel):
     content: str
+
+
+class ArticleFacets(BaseModel):
+    count: int
+    types: list[FacetCount]
+    tags: list[FacetCount]
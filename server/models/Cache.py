@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class CacheMetrics(BaseModel):
+    backend: str | None
+    hits: int
+    misses: int
+    hit_ratio: float
+    entries: int | None
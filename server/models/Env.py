@@ -51,3 +51,7 @@ class PostTag(BaseTag):
 class PutTag(BaseTag):
     pass
 
+
+class FacetCount(BaseModel):
+    id: int
+    count: int
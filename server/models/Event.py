@@ -1,6 +1,5 @@
 from pydantic import BaseModel, UUID4, field_serializer
-from .Env import GetTag, GetCity
-from .User import UserGet
+from .Env import GetTag, GetCity, FacetCount
 from datetime import datetime
 
 
@@ -18,6 +17,7 @@ class BaseEvent(BaseModel):
     address: str
     name: str
     description_lite: str
+    capacity: int | None = None
 
 
 class PostEvent(BaseEvent):
@@ -39,7 +39,6 @@ class GetLiteEvent(BaseEvent):
 
 class GetEvent(GetLiteEvent):
     description: str
-    users: list[UserGet]
 
 
 class UpdateEvent(BaseEvent):
@@ -50,7 +49,16 @@ class UpdateEvent(BaseEvent):
 
 class UserRegInfo(BaseModel):
     count: int
+    capacity: int | None = None
     youReg: bool
+    youWait: bool = False
 
 
+class CalendarToken(BaseModel):
+    token: str
 
+
+class EventFacets(BaseModel):
+    count: int
+    cities: list[FacetCount]
+    tags: list[FacetCount]
@@ -0,0 +1,17 @@
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from datetime import datetime
+import json
+
+
+def encode_cursor(date: datetime, id_row: int) -> str:
+    payload = json.dumps([date.isoformat(), id_row], separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        date, id_row = json.loads(urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(date), int(id_row)
+    except Exception:
+        raise ValueError("invalid cursor")
@@ -1,8 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc
-from ..tables import Article, TagArticle, Comment, Like, User
+from sqlalchemy import select, func, and_, desc, exists, tuple_, text, update, delete, values, column, Integer, literal, distinct, or_, true
+from sqlalchemy.dialects.postgresql import insert, UUID
+from sqlalchemy.orm import undefer, aliased
+from ..tables import Article, TagArticle, Comment, Like, User, Tag
 from ..database import get_session
 from fastapi import Depends
+from datetime import datetime
+from collections import Counter
 
 
 class ArticleRepository:
@@ -10,11 +14,45 @@ class ArticleRepository:
         self.__session: AsyncSession = session
 
     async def count_row(self, tags_list: list[int] | None, type_article: int | None) -> int:
-        response = select(func.count(Article.id)).join(TagArticle)
+        response = select(func.count(Article.id))
+        response = self.__filter_article(response, tags_list, type_article)
+        result = await self.__session.execute(response)
+        return result.scalars().first()
+
+    async def get_facets(self, tags_list: list[int] | None, type_article: int | None) -> dict:
+        # each dimension is counted without its own filter, so selecting a type
+        # still shows the counts of the other types
+        by_tags = true()
         if tags_list is not None:
-            response = response.where(TagArticle.id_tag.in_(tags_list))
-        if type_article is not None:
-            response = response.where(Article.id_type == type_article)
+            by_tags = exists().where(and_(
+                TagArticle.id_article == Article.id,
+                TagArticle.id_tag.in_(tags_list)
+            ))
+        by_type = true() if type_article is None else Article.id_type == type_article
+        tag = aliased(TagArticle)
+        response = (select(Article.id_type,
+                           tag.id_tag,
+                           func.grouping(Article.id_type, tag.id_tag),
+                           func.count(distinct(Article.id)).filter(and_(by_tags, by_type)),
+                           func.count(distinct(Article.id)).filter(by_tags),
+                           func.count(distinct(Article.id)).filter(by_type))
+                    .select_from(Article)
+                    .outerjoin(tag, tag.id_article == Article.id)
+                    .where(or_(by_tags, by_type))
+                    .group_by(func.grouping_sets(tuple_(Article.id_type), tuple_(tag.id_tag), tuple_())))
+        result = await self.__session.execute(response)
+        facets = {"count": 0, "types": [], "tags": []}
+        for id_type, id_tag, grouping, count, count_type, count_tag in result.all():
+            if grouping == 3:
+                facets["count"] = count
+            elif grouping == 1 and id_type is not None and count_type > 0:
+                facets["types"].append({"id": id_type, "count": count_type})
+            elif grouping == 2 and id_tag is not None and count_tag > 0:
+                facets["tags"].append({"id": id_tag, "count": count_tag})
+        return facets
+
+    async def estimate_count_row(self) -> int:
+        response = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'article'::regclass")
         result = await self.__session.execute(response)
         return result.scalars().first()
 
@@ -23,14 +61,53 @@ class ArticleRepository:
                                 end: int,
                                 tags_list: list[int] | None,
                                 type_article: int | None) -> list[Article]:
-        response = select(Article).join(TagArticle).order_by(desc(Article.date_publications))
+        response = select(Article).order_by(desc(Article.date_publications), desc(Article.id))
+        response = self.__filter_article(response, tags_list, type_article)
+
+        response = response.offset(start).limit(end)
+        result = await self.__session.execute(response)
+        return result.unique().scalars().all()
+
+    def __filter_article(self, response, tags_list: list[int] | None, type_article: int | None):
         if tags_list is not None:
-            response = response.where(TagArticle.id_tag.in_(tags_list))
+            response = response.where(exists().where(and_(
+                TagArticle.id_article == Article.id,
+                TagArticle.id_tag.in_(tags_list)
+            )))
         if type_article is not None:
             response = response.where(Article.id_type == type_article)
+        return response
+
+    async def get_limit_article_with_count(self,
+                                           start: int,
+                                           end: int,
+                                           tags_list: list[int] | None,
+                                           type_article: int | None) -> tuple[list[Article], int]:
+        response = (select(Article, func.count().over().label("total"))
+                    .order_by(desc(Article.date_publications), desc(Article.id)))
+        response = self.__filter_article(response, tags_list, type_article)
 
         response = response.offset(start).limit(end)
         result = await self.__session.execute(response)
+        rows = result.unique().all()
+        if len(rows) == 0:
+            if start == 0:
+                return [], 0
+            return [], await self.count_row(tags_list, type_article)
+        return [row[0] for row in rows], rows[0][1]
+
+    async def get_limit_article_after(self,
+                                      cursor: tuple[datetime, int] | None,
+                                      count: int,
+                                      tags_list: list[int] | None,
+                                      type_article: int | None) -> list[Article]:
+        response = select(Article).order_by(desc(Article.date_publications), desc(Article.id))
+        response = self.__filter_article(response, tags_list, type_article)
+        if cursor is not None:
+            response = response.where(tuple_(Article.date_publications, Article.id) < cursor)
+
+        response = response.limit(count)
+        result = await self.__session.execute(response)
         return result.unique().scalars().all()
 
     async def get_article_by_uuid(self, uuid: str) -> Article:
@@ -38,12 +115,34 @@ class ArticleRepository:
         result = await self.__session.execute(response)
         return result.unique().scalars().one()
 
+    async def get_version_by_uuid(self, uuid: str) -> int | None:
+        response = select(Article.version).where(Article.uuid == uuid)
+        result = await self.__session.execute(response)
+        return result.scalars().first()
+
+    async def get_full_article_by_uuid(self, uuid: str) -> Article:
+        response = select(Article).options(undefer(Article.description)).where(Article.uuid == uuid)
+        result = await self.__session.execute(response)
+        return result.unique().scalars().one()
+
     async def get_article_by_search(self, name: str, count: int) -> list[Article]:
+        query = func.websearch_to_tsquery("russian", name)
+        response = select(Article).where(
+            Article.search_vector.bool_op("@@")(query)
+        ).order_by(desc(func.ts_rank_cd(Article.search_vector, query)),
+                   desc(Article.date_publications)).limit(count)
+        result = await self.__session.execute(response)
+        articles = list(result.unique().scalars().all())
+        if len(articles) >= count:
+            return articles
+
         response = select(Article).where(and_(
-            Article.name.ilike(f'%{name}%'),
-        )).order_by(desc(Article.date_publications)).limit(count)
+            Article.name.bool_op("%>")(name),
+            Article.id.not_in([i.id for i in articles])
+        )).order_by(desc(func.word_similarity(name, Article.name)),
+                    desc(Article.date_publications)).limit(count - len(articles))
         result = await self.__session.execute(response)
-        return result.unique().scalars().all()
+        return articles + list(result.unique().scalars().all())
 
     async def add(self, entity: Article):
         try:
@@ -63,23 +162,66 @@ class ArticleRepository:
         result = await self.__session.execute(response)
         return result.unique().scalars().all()
 
-    async def delete(self, target: Article):
-        try:
-            likes = await self.get_all_like_by_article(target.uuid)
-            comments = await self.get_all_comment_by_article(target.uuid)
-            for i in likes:
-                await self.__session.delete(i)
+    async def get_comment_by_article_after(self,
+                                           uuid_article: str,
+                                           cursor: tuple[datetime, int] | None,
+                                           count: int) -> list:
+        response = (select(Comment.id,
+                           Comment.uuid,
+                           Comment.content,
+                           Comment.date_publications,
+                           User.uuid.label("uuid_user"),
+                           User.name,
+                           User.surname,
+                           User.icon)
+                    .join(User, User.id == Comment.id_user)
+                    .where(Comment.id_article == select(Article.id).where(Article.uuid == uuid_article).scalar_subquery())
+                    .order_by(desc(Comment.date_publications), desc(Comment.id)))
+        if cursor is not None:
+            response = response.where(tuple_(Comment.date_publications, Comment.id) < cursor)
 
-            for i in comments:
-                await self.__session.delete(i)
+        response = response.limit(count)
+        result = await self.__session.execute(response)
+        return result.all()
 
-            await self.__session.delete(target)
+    async def delete(self, target: Article):
+        await self.delete_list([target.uuid])
+
+    async def delete_list(self, uuid_list: list[str]) -> int:
+        id_list = select(Article.id).where(Article.uuid.in_(uuid_list)).scalar_subquery()
+        try:
+            await self.__session.execute(delete(Like).where(Like.id_article.in_(id_list)))
+            await self.__session.execute(delete(Comment).where(Comment.id_article.in_(id_list)))
+            await self.__session.execute(delete(TagArticle).where(TagArticle.id_article.in_(id_list)))
+            result = await self.__session.execute(delete(Article).where(Article.uuid.in_(uuid_list)))
+            if result.rowcount < len(uuid_list):
+                raise Exception
             await self.__session.commit()
+            return result.rowcount
         except Exception:
             await self.__session.rollback()
+            raise Exception
 
     async def update(self, entity: Article):
+        entity.version = Article.version + 1
+        try:
+            self.__session.add(entity)
+            await self.__session.commit()
+        except:
+            await self.__session.rollback()
+            raise Exception
+
+    async def update_with_tags(self, entity: Article, tags_list: list[int]):
+        entity.version = Article.version + 1
         try:
+            await self.__session.execute(delete(TagArticle).where(and_(
+                TagArticle.id_article == entity.id,
+                TagArticle.id_tag.not_in(tags_list)
+            )))
+            await self.__session.execute(insert(TagArticle).from_select(
+                ["id_tag", "id_article"],
+                select(Tag.id, literal(entity.id)).where(Tag.id.in_(tags_list))
+            ).on_conflict_do_nothing())
             self.__session.add(entity)
             await self.__session.commit()
         except:
@@ -92,32 +234,112 @@ class ArticleRepository:
         result = await self.__session.execute(user_liked)
         return result.scalars().first()
 
+    async def get_likes_count(self, uuid_article: str) -> int | None:
+        response = select(Article.likes_count).where(Article.uuid == uuid_article)
+        result = await self.__session.execute(response)
+        return result.scalars().first()
+
     async def get_like_info_by_uuid(self, uuid_article: str, uuid_user: str):
-        likes_count = len(await self.get_all_like_by_article(uuid_article))
-        info = await self.get_like_by_user_and_article(uuid_article, uuid_user) is not None
+        user_liked = exists().where(and_(
+            Like.id_article == Article.id,
+            Like.id_user == select(User.id).where(User.uuid == uuid_user).scalar_subquery()
+        ))
+        response = select(Article.likes_count, user_liked).where(Article.uuid == uuid_article)
+        result = await self.__session.execute(response)
+        row = result.first()
+        if row is None:
+            return None
 
-        return {"likes_count": likes_count, "user_liked": info}
+        return {"likes_count": row[0], "user_liked": row[1]}
+
+    async def get_like_info_by_uuid_list(self, uuid_list: list[str], uuid_user: str | None) -> list:
+        user_liked = exists().where(and_(
+            Like.id_article == Article.id,
+            Like.id_user == select(User.id).where(User.uuid == uuid_user).scalar_subquery()
+        ))
+        response = select(Article.uuid, Article.likes_count, user_liked).where(Article.uuid.in_(uuid_list))
+        result = await self.__session.execute(response)
+        return result.all()
 
     async def add_like(self, id_article: int, id_user: int):
-        target = Like(
+        response = insert(Like).values(
             id_article=id_article,
             id_user=id_user
-        )
+        ).on_conflict_do_nothing().returning(Like.id_article)
         try:
-            self.__session.add(target)
+            result = await self.__session.execute(response)
+            if result.first() is not None:
+                await self.__session.execute(update(Article)
+                                             .where(Article.id == id_article)
+                                             .values(likes_count=Article.likes_count + 1))
             await self.__session.commit()
         except:
             await self.__session.rollback()
             raise Exception
 
     async def delete_like(self,  uuid_article: str, uuid_user: str):
-        target = await self.get_like_by_user_and_article(uuid_article, uuid_user)
+        response = delete(Like).where(and_(
+            Like.id_article == select(Article.id).where(Article.uuid == uuid_article).scalar_subquery(),
+            Like.id_user == select(User.id).where(User.uuid == uuid_user).scalar_subquery()
+        )).returning(Like.id_article)
         try:
-            await self.__session.delete(target)
+            result = await self.__session.execute(response)
+            id_article = result.scalars().first()
+            if id_article is not None:
+                await self.__session.execute(update(Article)
+                                             .where(Article.id == id_article)
+                                             .values(likes_count=Article.likes_count - 1))
             await self.__session.commit()
         except Exception:
             await self.__session.rollback()
 
+    async def apply_likes(self, likes: list[tuple[str, str]], unlikes: list[tuple[str, str]]):
+        delta = Counter()
+        try:
+            if len(likes) > 0:
+                pairs = values(column("uuid_article", UUID(as_uuid=False)), column("uuid_user", UUID(as_uuid=False)), name="pairs").data(likes)
+                response = insert(Like).from_select(
+                    ["id_article", "id_user"],
+                    select(Article.id, User.id)
+                    .join(pairs, Article.uuid == pairs.c.uuid_article)
+                    .join(User, User.uuid == pairs.c.uuid_user)
+                ).on_conflict_do_nothing().returning(Like.id_article)
+                result = await self.__session.execute(response)
+                delta.update(result.scalars().all())
+
+            if len(unlikes) > 0:
+                pairs = values(column("uuid_article", UUID(as_uuid=False)), column("uuid_user", UUID(as_uuid=False)), name="pairs").data(unlikes)
+                response = delete(Like).where(and_(
+                    Like.id_article == Article.id,
+                    Like.id_user == User.id,
+                    Article.uuid == pairs.c.uuid_article,
+                    User.uuid == pairs.c.uuid_user
+                )).returning(Like.id_article)
+                result = await self.__session.execute(response)
+                delta.subtract(result.scalars().all())
+
+            delta_list = [(id_article, count) for id_article, count in delta.items() if count != 0]
+            if len(delta_list) > 0:
+                changes = values(column("id_article", Integer), column("delta", Integer), name="changes").data(delta_list)
+                await self.__session.execute(update(Article)
+                                             .where(Article.id == changes.c.id_article)
+                                             .values(likes_count=Article.likes_count + changes.c.delta))
+            await self.__session.commit()
+        except Exception:
+            await self.__session.rollback()
+            raise Exception
+
+    async def reconcile_likes_count(self) -> int:
+        likes_count = select(func.count()).where(Like.id_article == Article.id).scalar_subquery()
+        response = update(Article).where(Article.likes_count != likes_count).values(likes_count=likes_count)
+        try:
+            result = await self.__session.execute(response)
+            await self.__session.commit()
+            return result.rowcount
+        except:
+            await self.__session.rollback()
+            raise Exception
+
     async def add_comment(self, entity: Comment):
         try:
             self.__session.add(entity)
@@ -131,12 +353,15 @@ class ArticleRepository:
         result = await self.__session.execute(response)
         return result.unique().scalars().one()
 
-    async def delete_comment(self, uuid_comment: str):
+    async def delete_comment(self, uuid_comment: str) -> str | None:
+        response = delete(Comment).where(Comment.uuid == uuid_comment).returning(
+            select(Article.uuid).where(Article.id == Comment.id_article).scalar_subquery()
+        )
         try:
-            target = await self.get_comment_by_uuid(uuid_comment)
-
-            await self.__session.delete(target)
+            result = await self.__session.execute(response)
+            uuid_article = result.scalars().first()
             await self.__session.commit()
+            return uuid_article
         except Exception:
             await self.__session.rollback()
 
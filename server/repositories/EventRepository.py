@@ -1,20 +1,67 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc
-from ..tables import Event, Tag, UserToEvent, StateEvent, User, TagEvent
+from sqlalchemy import select, func, and_, or_, desc, exists, text, delete, literal, update, tuple_, distinct, true, DateTime
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import undefer, aliased
+from ..tables import Event, Tag, UserToEvent, StateEvent, User, TagEvent, WaitList, City
 from ..database import get_session
 from fastapi import Depends
+from datetime import datetime, timezone
 
 
 class EventRepository:
     def __init__(self, session: AsyncSession = Depends(get_session)):
         self.__session: AsyncSession = session
 
-    async def count_row(self, tags_list: list[int] | None, city: int | None) -> int:
-        response = select(func.count(Event.id)).join(TagEvent)
+    def __filter_event(self, response, tags_list: list[int] | None, city: int | None):
         if tags_list is not None:
-            response = response.where(TagEvent.id_tag.in_(tags_list))
+            response = response.where(exists().where(and_(
+                TagEvent.id_event == Event.id,
+                TagEvent.id_tag.in_(tags_list)
+            )))
         if city is not None:
             response = response.where(Event.id_city == city)
+        return response
+
+    async def count_row(self, tags_list: list[int] | None, city: int | None) -> int:
+        response = select(func.count(Event.id))
+        response = self.__filter_event(response, tags_list, city)
+        result = await self.__session.execute(response)
+        return result.scalars().first()
+
+    async def get_facets(self, tags_list: list[int] | None, city: int | None) -> dict:
+        # each dimension is counted without its own filter, so selecting a city
+        # still shows the counts of the other cities
+        by_tags = true()
+        if tags_list is not None:
+            by_tags = exists().where(and_(
+                TagEvent.id_event == Event.id,
+                TagEvent.id_tag.in_(tags_list)
+            ))
+        by_city = true() if city is None else Event.id_city == city
+        tag = aliased(TagEvent)
+        response = (select(Event.id_city,
+                           tag.id_tag,
+                           func.grouping(Event.id_city, tag.id_tag),
+                           func.count(distinct(Event.id)).filter(and_(by_tags, by_city)),
+                           func.count(distinct(Event.id)).filter(by_tags),
+                           func.count(distinct(Event.id)).filter(by_city))
+                    .select_from(Event)
+                    .outerjoin(tag, tag.id_event == Event.id)
+                    .where(or_(by_tags, by_city))
+                    .group_by(func.grouping_sets(tuple_(Event.id_city), tuple_(tag.id_tag), tuple_())))
+        result = await self.__session.execute(response)
+        facets = {"count": 0, "cities": [], "tags": []}
+        for id_city, id_tag, grouping, count, count_city, count_tag in result.all():
+            if grouping == 3:
+                facets["count"] = count
+            elif grouping == 1 and id_city is not None and count_city > 0:
+                facets["cities"].append({"id": id_city, "count": count_city})
+            elif grouping == 2 and id_tag is not None and count_tag > 0:
+                facets["tags"].append({"id": id_tag, "count": count_tag})
+        return facets
+
+    async def estimate_count_row(self) -> int:
+        response = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'event'::regclass")
         result = await self.__session.execute(response)
         return result.scalars().first()
 
@@ -42,13 +89,51 @@ class EventRepository:
                               tags_list: list[int] | None,
                               city: int | None
                               ) -> list[Event]:
-        response = select(Event).join(StateEvent).join(TagEvent, TagEvent.id_event == Event.id).order_by(desc(Event.date_conducting))
-        if tags_list is not None:
-            response = response.where(TagEvent.id_tag.in_(tags_list))
+        response = select(Event).order_by(desc(Event.date_conducting), desc(Event.id))
+        response = self.__filter_event(response, tags_list, city)
+
+        response = response.offset(start).limit(end)
+        result = await self.__session.execute(response)
+        return result.unique().scalars().all()
+
+    async def get_limit_event_with_count(self,
+                                         start: int,
+                                         end: int,
+                                         tags_list: list[int] | None,
+                                         city: int | None
+                                         ) -> tuple[list[Event], int]:
+        response = (select(Event, func.count().over().label("total"))
+                    .order_by(desc(Event.date_conducting), desc(Event.id)))
+        response = self.__filter_event(response, tags_list, city)
+
+        response = response.offset(start).limit(end)
+        result = await self.__session.execute(response)
+        rows = result.unique().all()
+        if len(rows) == 0:
+            if start == 0:
+                return [], 0
+            return [], await self.count_row(tags_list, city)
+        return [row[0] for row in rows], rows[0][1]
+
+    async def get_limit_event_by_range(self,
+                                       date_from: datetime,
+                                       date_to: datetime,
+                                       city: int | None,
+                                       after: tuple[datetime, int] | None,
+                                       count: int
+                                       ) -> list[Event]:
+        max_duration = select(func.max(Event.date_stop - Event.date_conducting)).scalar_subquery()
+        response = (select(Event)
+                    .where(and_(Event.date_conducting <= date_to,
+                                Event.date_conducting >= literal(date_from, DateTime(timezone=True)) - max_duration,
+                                Event.date_stop >= date_from))
+                    .order_by(Event.date_conducting, Event.id))
         if city is not None:
             response = response.where(Event.id_city == city)
+        if after is not None:
+            response = response.where(tuple_(Event.date_conducting, Event.id) > tuple_(*after))
 
-        response = response.offset(start).limit(end)
+        response = response.limit(count)
         result = await self.__session.execute(response)
         return result.unique().scalars().all()
 
@@ -57,21 +142,59 @@ class EventRepository:
         result = await self.__session.execute(response)
         return result.unique().scalars().one()
 
-    async def get_event_by_search(self, name: str, count: int) -> list[Event]:
-        response = select(Event).where(and_(
-            Event.name.ilike(f'%{name}%'),
-        )).order_by(desc(Event.date_conducting).limit(count))
+    async def get_version_by_uuid(self, uuid: str) -> int | None:
+        response = select(Event.version).where(Event.uuid == uuid)
+        result = await self.__session.execute(response)
+        return result.scalars().first()
+
+    async def get_full_event_by_uuid(self, uuid: str) -> Event:
+        response = (select(Event)
+                    .options(undefer(Event.description))
+                    .where(Event.uuid == uuid))
+        result = await self.__session.execute(response)
+        return result.unique().scalars().one()
+
+    async def get_event_by_search(self,
+                                  name: str,
+                                  count: int,
+                                  city: int | None,
+                                  date_from: datetime | None,
+                                  date_to: datetime | None
+                                  ) -> list[Event]:
+        pattern = "%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        response = select(Event).where(or_(
+            Event.name.ilike(pattern, escape="\\"),
+            Event.address.ilike(pattern, escape="\\"),
+            Event.description_lite.ilike(pattern, escape="\\")
+        ))
+        if city is not None:
+            response = response.where(Event.id_city == city)
+        if date_from is not None:
+            response = response.where(Event.date_stop >= date_from)
+        if date_to is not None:
+            response = response.where(Event.date_conducting <= date_to)
+
+        response = response.order_by(desc(func.word_similarity(name, Event.name)),
+                                      desc(func.greatest(func.word_similarity(name, Event.address),
+                                                         func.word_similarity(name, Event.description_lite))),
+                                      desc(Event.date_conducting),
+                                      desc(Event.id)).limit(count)
         result = await self.__session.execute(response)
         return result.unique().scalars().all()
 
     async def delete(self, target: Event):
         try:
-            await self.__session.delete(target)
+            await self.__session.execute(delete(UserToEvent).where(UserToEvent.id_event == target.id))
+            await self.__session.execute(delete(WaitList).where(WaitList.id_event == target.id))
+            await self.__session.execute(delete(TagEvent).where(TagEvent.id_event == target.id))
+            await self.__session.execute(delete(Event).where(Event.id == target.id))
             await self.__session.commit()
         except Exception:
             await self.__session.rollback()
 
     async def update(self, entity: Event):
+        entity.version = Event.version + 1
+        entity.date_update = datetime.now(timezone.utc)
         try:
             self.__session.add(entity)
             await self.__session.commit()
@@ -79,39 +202,238 @@ class EventRepository:
             await self.__session.rollback()
             raise Exception
 
+    async def update_with_tags(self, entity: Event, tags_list: list[int]):
+        entity.version = Event.version + 1
+        entity.date_update = datetime.now(timezone.utc)
+        try:
+            await self.__session.execute(delete(TagEvent).where(and_(
+                TagEvent.id_event == entity.id,
+                TagEvent.id_tag.not_in(tags_list)
+            )))
+            await self.__session.execute(insert(TagEvent).from_select(
+                ["id_tag", "id_event"],
+                select(Tag.id, literal(entity.id)).where(Tag.id.in_(tags_list))
+            ).on_conflict_do_nothing())
+            self.__session.add(entity)
+            await self.__session.commit()
+        except:
+            await self.__session.rollback()
+            raise Exception
+
     async def get_user_reg_by_user_and_event(self, uuid_event: str, uuid_user: str) -> UserToEvent | None:
         user_liked = select(UserToEvent).join(Event).join(User, User.id == UserToEvent.id_user).where(User.uuid == uuid_user).where(
             Event.uuid == uuid_event)
         result = await self.__session.execute(user_liked)
         return result.scalars().first()
 
-    async def get_user_reg_info_by_uuid(self, uuid_event: str, uuid_user: str):
-        t = await self.get_event_by_uuid(uuid_event)
-        user_count = len(t.users)
-        info = await self.get_user_reg_by_user_and_event(uuid_event, uuid_user) is not None
+    async def get_user_reg_info_by_uuid(self, uuid_event: str, uuid_user: str | None):
+        id_event = select(Event.id).where(Event.uuid == uuid_event).scalar_subquery()
+        if uuid_user is not None:
+            id_user = select(User.id).where(User.uuid == uuid_user).scalar_subquery()
+            is_user = exists().where(and_(
+                UserToEvent.id_event == id_event,
+                UserToEvent.id_user == id_user
+            ))
+            is_wait = exists().where(and_(
+                WaitList.id_event == id_event,
+                WaitList.id_user == id_user
+            ))
+        else:
+            is_user = literal(False)
+            is_wait = literal(False)
+        response = select(Event.count_reg, Event.capacity, is_user, is_wait).where(Event.uuid == uuid_event)
+        result = await self.__session.execute(response)
+        row = result.first()
+        if row is None:
+            return None
+        return {"user_count": row[0], "capacity": row[1], "is_user": row[2], "is_wait": row[3]}
 
-        return {"user_count": user_count, "is_user": info}
+    async def count_user_reg(self, uuid_event: str) -> int:
+        response = (select(func.count(UserToEvent.id_user))
+                    .join(Event, Event.id == UserToEvent.id_event)
+                    .where(Event.uuid == uuid_event))
+        result = await self.__session.execute(response)
+        return result.scalars().first()
 
-    async def add_user_reg(self, id_event: int, id_user: int):
-        target = UserToEvent(
-            id_event=id_event,
-            id_user=id_user
-        )
+    async def get_limit_user_reg(self, uuid_event: str, start: int, end: int) -> list[User]:
+        response = (select(User)
+                    .join(UserToEvent, User.id == UserToEvent.id_user)
+                    .join(Event, Event.id == UserToEvent.id_event)
+                    .where(Event.uuid == uuid_event)
+                    .order_by(User.id).offset(start).limit(end))
+        result = await self.__session.execute(response)
+        return result.unique().scalars().all()
+
+    async def add_user_reg(self, id_event: int, id_user: int) -> str:
         try:
-            self.__session.add(target)
+            result = await self.__session.execute(insert(UserToEvent).values(
+                id_event=id_event,
+                id_user=id_user
+            ).on_conflict_do_nothing().returning(UserToEvent.id_user))
+            if result.first() is None:
+                await self.__session.commit()
+                return "registered"
+            result = await self.__session.execute(update(Event).where(and_(
+                Event.id == id_event,
+                or_(Event.capacity.is_(None), Event.count_reg < Event.capacity),
+                ~exists().where(WaitList.id_event == Event.id)
+            )).values(count_reg=Event.count_reg + 1))
+            if result.rowcount == 0:
+                await self.__session.rollback()
+                await self.__session.execute(insert(WaitList).values(
+                    id_event=id_event,
+                    id_user=id_user,
+                    date_created=datetime.now()
+                ).on_conflict_do_nothing())
+                await self.__session.commit()
+                return "waiting"
             await self.__session.commit()
+            return "registered"
         except:
             await self.__session.rollback()
             raise Exception
 
     async def delete_user_reg(self, uuid_event: str, uuid_user: str):
-        target = await self.get_user_reg_by_user_and_event(uuid_event, uuid_user)
+        id_event = select(Event.id).where(Event.uuid == uuid_event).scalar_subquery()
+        id_user = select(User.id).where(User.uuid == uuid_user).scalar_subquery()
         try:
-            await self.__session.delete(target)
+            result = await self.__session.execute(delete(UserToEvent).where(and_(
+                UserToEvent.id_event == id_event,
+                UserToEvent.id_user == id_user
+            )).returning(UserToEvent.id_event))
+            deleted = result.scalars().first()
+            if deleted is not None:
+                await self.__session.execute(update(Event).where(Event.id == deleted)
+                                             .values(count_reg=Event.count_reg - 1))
+            await self.__session.execute(delete(WaitList).where(and_(
+                WaitList.id_event == id_event,
+                WaitList.id_user == id_user
+            )))
             await self.__session.commit()
         except Exception:
             await self.__session.rollback()
 
+    async def promote_wait_list(self, count_event: int) -> int:
+        response = (select(Event.id, Event.capacity - Event.count_reg)
+                    .where(and_(
+                        or_(Event.capacity.is_(None), Event.count_reg < Event.capacity),
+                        exists().where(WaitList.id_event == Event.id)
+                    ))
+                    .order_by(Event.id)
+                    .limit(count_event)
+                    .with_for_update(skip_locked=True))
+        try:
+            result = await self.__session.execute(response)
+            events = result.all()
+            promoted = 0
+            for id_event, free in events:
+                first_wait = (select(WaitList.id)
+                              .where(WaitList.id_event == id_event)
+                              .order_by(WaitList.id)
+                              .limit(free if free is not None else count_event))
+                result = await self.__session.execute(delete(WaitList)
+                                                      .where(WaitList.id.in_(first_wait))
+                                                      .returning(WaitList.id_user))
+                users = result.scalars().all()
+                if len(users) == 0:
+                    continue
+                result = await self.__session.execute(insert(UserToEvent).values([
+                    {"id_event": id_event, "id_user": id_user} for id_user in users
+                ]).on_conflict_do_nothing().returning(UserToEvent.id_user))
+                count = len(result.all())
+                await self.__session.execute(update(Event).where(Event.id == id_event)
+                                             .values(count_reg=Event.count_reg + count))
+                promoted += count
+            await self.__session.commit()
+            return promoted
+        except:
+            await self.__session.rollback()
+            raise Exception
+
+    async def reconcile_count_reg(self) -> int:
+        count_reg = select(func.count()).where(UserToEvent.id_event == Event.id).scalar_subquery()
+        response = update(Event).where(Event.count_reg != count_reg).values(count_reg=count_reg)
+        try:
+            result = await self.__session.execute(response)
+            await self.__session.commit()
+            return result.rowcount
+        except:
+            await self.__session.rollback()
+            raise Exception
+
+    async def update_state_by_date(self) -> list[str]:
+        opened = select(StateEvent.id).where(StateEvent.name == "opened").scalar_subquery()
+        closed = select(StateEvent.id).where(StateEvent.name == "closed").scalar_subquery()
+        passed = select(StateEvent.id).where(StateEvent.name == "passed").scalar_subquery()
+        try:
+            result = await self.__session.execute(update(Event).where(and_(
+                Event.date_stop <= func.now(),
+                Event.id_state != passed
+            )).values(id_state=passed, version=Event.version + 1, date_update=func.now()).returning(Event.uuid))
+            uuid_list = list(result.scalars().all())
+            result = await self.__session.execute(update(Event).where(and_(
+                Event.date_conducting <= func.now(),
+                Event.date_stop > func.now(),
+                Event.id_state == opened
+            )).values(id_state=closed, version=Event.version + 1, date_update=func.now()).returning(Event.uuid))
+            uuid_list.extend(result.scalars().all())
+            await self.__session.commit()
+            return [str(i) for i in uuid_list]
+        except:
+            await self.__session.rollback()
+            raise Exception
+
+    def __filter_calendar(self, response, city: int | None, uuid_user: str | None):
+        if city is not None:
+            response = response.where(Event.id_city == city)
+        if uuid_user is not None:
+            response = response.where(exists().where(and_(
+                UserToEvent.id_event == Event.id,
+                UserToEvent.id_user == select(User.id).where(User.uuid == uuid_user).scalar_subquery()
+            )))
+        return response
+
+    async def get_calendar_stamp(self, city: int | None, uuid_user: str | None) -> tuple[int, int, datetime | None]:
+        response = select(func.count(Event.id), func.coalesce(func.sum(Event.id), 0), func.max(Event.date_update))
+        response = self.__filter_calendar(response, city, uuid_user)
+        result = await self.__session.execute(response)
+        return tuple(result.one())
+
+    async def stream_calendar(self, city: int | None, uuid_user: str | None, chunk: int):
+        response = (select(Event.uuid,
+                           Event.name,
+                           Event.date_conducting,
+                           Event.date_stop,
+                           Event.date_update,
+                           City.name,
+                           Event.address,
+                           Event.description_lite)
+                    .select_from(Event)
+                    .outerjoin(City, City.id == Event.id_city)
+                    .order_by(Event.date_conducting, Event.id)
+                    .execution_options(yield_per=chunk))
+        response = self.__filter_calendar(response, city, uuid_user)
+        return await self.__session.stream(response)
+
+    async def stream_user_reg(self, uuid_events: list[str], chunk: int):
+        response = (select(Event.uuid,
+                           Event.name,
+                           User.uuid,
+                           User.surname,
+                           User.name,
+                           User.patronymic,
+                           User.email,
+                           User.phone,
+                           User.city,
+                           User.birth_date)
+                    .select_from(UserToEvent)
+                    .join(Event, Event.id == UserToEvent.id_event)
+                    .join(User, User.id == UserToEvent.id_user)
+                    .where(Event.uuid.in_(uuid_events))
+                    .order_by(Event.id, User.id)
+                    .execution_options(yield_per=chunk))
+        return await self.__session.stream(response)
+
     async def count_row_by_user(self, uuid_user: str) -> int:
         response = select(func.count(Event.id)).join(UserToEvent).join(User, User.id == UserToEvent.id_user).where(uuid_user == User.uuid)
         result = await self.__session.execute(response)
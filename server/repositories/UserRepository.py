@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_, desc
 from ..tables import User, TypeUser as TypeUserORM
 from ..database import get_session
 
@@ -13,7 +13,7 @@ class UserRepository:
         self.__session: AsyncSession = session
 
     async def count_row(self) -> int:
-        response = select(func.count(User.id))
+        response = select(func.count(User.id)).where(User.is_deleted == False)
         result = await self.__session.execute(response)
         return result.scalars().first()
 
@@ -61,6 +61,11 @@ class UserRepository:
         result = await self.__session.execute(response)
         return result.scalars().one()
 
+    async def get_user_by_calendar_token(self, token: str) -> User | None:
+        response = select(User).where(User.calendar_token == token).where(User.is_deleted == False)
+        result = await self.__session.execute(response)
+        return result.scalars().first()
+
     async def get_users_by_search_field(self,
                                         surname: str,
                                         name: str,
@@ -74,6 +79,23 @@ class UserRepository:
         result = await self.__session.execute(response)
         return result.scalars().all()
 
+    async def get_users_by_autocomplete(self, search_field: str, count: int) -> list[User]:
+        term = search_field.strip().lower()
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        name_match = and_(*[
+            User.full_name.like(f"%{i}%", escape="\\") for i in escaped.split()
+        ])
+        response = select(User).where(or_(
+            name_match,
+            func.lower(User.email).like(f"{escaped}%", escape="\\"),
+            User.phone.like(f"{escaped}%", escape="\\")
+        )).where(User.is_deleted == False).order_by(
+            desc(func.word_similarity(term, User.full_name)),
+            User.id
+        ).limit(count)
+        result = await self.__session.execute(response)
+        return result.scalars().all()
+
     async def update(self, user: User):
         try:
             self.__session.add(user)
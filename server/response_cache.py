@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+import json
+
+from fastapi import Request, Response
+
+from .serialization import json_response
+from .settings import settings
+
+
+class CacheBackend(ABC):
+    shared: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, tags: list[str]):
+        pass
+
+    @abstractmethod
+    async def invalidate(self, tags: list[str]):
+        pass
+
+    @abstractmethod
+    def count_entries(self) -> int | None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_size: int, ttl: int):
+        self.__max_size: int = max_size
+        self.__ttl: int = ttl
+        self.__size: int = 0
+        self.__items: OrderedDict[str, tuple[float, bytes, list[str]]] = OrderedDict()
+        self.__tags: dict[str, set[str]] = {}
+
+    def __remove(self, key: str):
+        item = self.__items.pop(key, None)
+        if item is None:
+            return
+        _, value, tags = item
+        self.__size -= len(value)
+        for tag in tags:
+            keys = self.__tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if len(keys) == 0:
+                    del self.__tags[tag]
+
+    async def get(self, key: str) -> bytes | None:
+        item = self.__items.get(key)
+        if item is None:
+            return None
+        expires, value, _ = item
+        if expires < monotonic():
+            self.__remove(key)
+            return None
+        self.__items.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, tags: list[str]):
+        if len(value) > self.__max_size:
+            return
+        self.__remove(key)
+        while self.__size + len(value) > self.__max_size:
+            self.__remove(next(iter(self.__items)))
+        self.__items[key] = (monotonic() + self.__ttl, value, tags)
+        self.__size += len(value)
+        for tag in tags:
+            self.__tags.setdefault(tag, set()).add(key)
+
+    async def invalidate(self, tags: list[str]):
+        for tag in tags:
+            for key in list(self.__tags.get(tag, ())):
+                self.__remove(key)
+
+    def count_entries(self) -> int | None:
+        return len(self.__items)
+
+
+class RedisCacheBackend(CacheBackend):
+    shared: bool = True
+
+    def __init__(self, url: str, ttl: int):
+        from redis import asyncio as redis
+
+        self.__client = redis.from_url(url)
+        self.__ttl: int = ttl
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.__client.get(f"response:{key}")
+
+    async def set(self, key: str, value: bytes, tags: list[str]):
+        async with self.__client.pipeline(transaction=False) as pipe:
+            pipe.set(f"response:{key}", value, ex=self.__ttl)
+            for tag in tags:
+                pipe.sadd(f"response_tag:{tag}", f"response:{key}")
+                pipe.expire(f"response_tag:{tag}", self.__ttl)
+            await pipe.execute()
+
+    async def invalidate(self, tags: list[str]):
+        for tag in tags:
+            keys = await self.__client.smembers(f"response_tag:{tag}")
+            await self.__client.delete(f"response_tag:{tag}", *keys)
+
+    def count_entries(self) -> int | None:
+        return None
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend | None):
+        self.__backend: CacheBackend | None = backend
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @staticmethod
+    def __key(request: Request) -> str:
+        query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def __is_enabled(self, shared_only: bool) -> bool:
+        return self.__backend is not None and (self.__backend.shared or not shared_only)
+
+    async def get(self, request: Request, shared_only: bool = False) -> Response | None:
+        if not self.__is_enabled(shared_only):
+            return None
+        value = await self.__backend.get(self.__key(request))
+        if value is None:
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        head, body = value.split(b"\n", 1)
+        headers = json.loads(head)
+        headers["X-Cache"] = "HIT"
+        return Response(content=body, headers=headers, media_type="application/json")
+
+    async def set(self, request: Request, content, headers: dict[str, str], tags: list[str],
+                  shared_only: bool = False) -> Response:
+        response = json_response(content, headers)
+        if self.__is_enabled(shared_only):
+            head = json.dumps(headers).encode("utf-8")
+            await self.__backend.set(self.__key(request), head + b"\n" + response.body, tags)
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+    async def invalidate(self, *tags: str):
+        if self.__backend is not None:
+            await self.__backend.invalidate(list(tags))
+
+    def metrics(self) -> dict:
+        total = self.__hits + self.__misses
+        return {
+            "backend": type(self.__backend).__name__ if self.__backend is not None else None,
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "hit_ratio": self.__hits / total if total > 0 else 0.0,
+            "entries": self.__backend.count_entries() if self.__backend is not None else None
+        }
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    return if_none_match.strip() == "*" or etag in [i.strip() for i in if_none_match.split(",")]
+
+
+def create_backend() -> CacheBackend | None:
+    if settings.cache_backend == "memory":
+        return MemoryCacheBackend(settings.cache_max_size, settings.cache_ttl)
+    if settings.cache_backend == "redis":
+        return RedisCacheBackend(settings.redis_url, settings.cache_ttl)
+    return None
+
+
+response_cache = ResponseCache(create_backend())
@@ -0,0 +1,26 @@
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from .models.Article import GetLiteArticle
+from .models.Event import GetLiteEvent
+from .models.User import UserGet
+from .settings import settings
+
+
+lite_article_list = TypeAdapter(list[GetLiteArticle])
+lite_event_list = TypeAdapter(list[GetLiteEvent])
+user_list = TypeAdapter(list[UserGet])
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return to_json(content)
+
+
+def json_response(content, headers: dict[str, str] | None = None) -> Response:
+    if settings.fast_serialization:
+        return FastJSONResponse(content=content, headers=headers)
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
@@ -1,10 +1,17 @@
 from fastapi import Depends, UploadFile
 
 from ..repositories import ArticleRepository, UserRepository, EnvRepository
+from .LikeBuffer import like_buffer
 from ..models.User import UserGet
 from ..models.Article import *
 from ..tables import Article, Comment
+from ..pagination import encode_cursor, decode_cursor
+from ..count_cache import count_cache, filter_key
+from ..response_cache import response_cache
+from ..settings import settings
+from ..serialization import lite_article_list
 from datetime import datetime
+from uuid import UUID
 
 
 class ArticleService:
@@ -26,17 +33,43 @@ class ArticleService:
     def count_item(self, item):
         self.__count_item = item
 
+    async def __get_cached_count_row(self, tags_list: list[int] | None, type_article: int | None) -> int | None:
+        key = filter_key(tags_list, type_article)
+        count_row = count_cache.get("article", key)
+        if count_row is None and settings.count_approximate and tags_list is None and type_article is None:
+            estimate = await self.__article_rep.estimate_count_row()
+            if estimate >= settings.count_approximate_threshold:
+                count_row = estimate
+                count_cache.set("article", key, count_row)
+        return count_row
+
     async def get_count_page(self, tags: str | None, type_article: int | None) -> int:
         tags_list = tags
         if tags is not None:
             tags_list = list(map(int, tags.split(",")))
 
-        count_row = await self.__article_rep.count_row(tags_list, type_article)
+        count_row = await self.__get_cached_count_row(tags_list, type_article)
+        if count_row is None:
+            count_row = await self.__article_rep.count_row(tags_list, type_article)
+            count_cache.set("article", filter_key(tags_list, type_article), count_row)
         sub_page = 0
         if count_row % self.__count_item > 0:
             sub_page += 1
         return count_row // self.__count_item + sub_page
 
+    async def get_facets(self, tags: str | None, type_article: int | None) -> ArticleFacets:
+        tags_list = tags
+        if tags is not None:
+            tags_list = list(map(int, tags.split(",")))
+
+        facets = await self.__article_rep.get_facets(tags_list, type_article)
+        count_cache.set("article", filter_key(tags_list, type_article), facets["count"])
+        return ArticleFacets(
+            count=facets["count"],
+            types=sorted(facets["types"], key=lambda i: -i["count"]),
+            tags=sorted(facets["tags"], key=lambda i: -i["count"])
+        )
+
     async def create_article(self, user: UserGet, target: PostArticle):
         user = await self.__user_repo.get_user_by_uuid(user.uuid)
 
@@ -52,8 +85,31 @@ class ArticleService:
         )
         entity.tags.extend(tags)
         await self.__article_rep.add(entity)
+        count_cache.invalidate("article")
+        await response_cache.invalidate("article")
         return entity
 
+    async def get_page_with_count(self,
+                                  num_page: int,
+                                  tags: str | None,
+                                  type_article: int | None) -> tuple[list[GetLiteArticle], int]:
+        tags_list = tags
+        if tags is not None:
+            tags_list = list(map(int, tags.split(",")))
+
+        start = (num_page - 1) * self.__count_item
+        count_row = await self.__get_cached_count_row(tags_list, type_article)
+        if count_row is None:
+            articles_entity, count_row = await self.__article_rep.get_limit_article_with_count(start, self.__count_item, tags_list, type_article)
+            count_cache.set("article", filter_key(tags_list, type_article), count_row)
+        else:
+            articles_entity = await self.__article_rep.get_limit_article(start, self.__count_item, tags_list, type_article)
+        sub_page = 0
+        if count_row % self.__count_item > 0:
+            sub_page += 1
+        articles = lite_article_list.validate_python(articles_entity, from_attributes=True)
+        return articles, count_row // self.__count_item + sub_page
+
     async def get_page_article(self,
                                num_page: int,
                                tags: str | None,
@@ -64,45 +120,71 @@ class ArticleService:
 
         start = (num_page - 1) * self.__count_item
         articles_entity = await self.__article_rep.get_limit_article(start, self.__count_item, tags_list, type_article)
-        articles = [GetLiteArticle.model_validate(entity, from_attributes=True) for entity in articles_entity]
+        articles = lite_article_list.validate_python(articles_entity, from_attributes=True)
         return articles
 
+    async def get_page_article_by_cursor(self,
+                                         cursor: str,
+                                         tags: str | None,
+                                         type_article: int | None) -> tuple[list[GetLiteArticle], str | None]:
+        tags_list = tags
+        if tags is not None:
+            tags_list = list(map(int, tags.split(",")))
+
+        after = decode_cursor(cursor) if cursor else None
+        articles_entity = await self.__article_rep.get_limit_article_after(after,
+                                                                           self.__count_item,
+                                                                           tags_list,
+                                                                           type_article)
+        next_cursor = None
+        if len(articles_entity) == self.__count_item:
+            last = articles_entity[-1]
+            next_cursor = encode_cursor(last.date_publications, last.id)
+        articles = lite_article_list.validate_python(articles_entity, from_attributes=True)
+        return articles, next_cursor
+
+    async def get_article_version(self, uuid: str) -> int | None:
+        return await self.__article_rep.get_version_by_uuid(uuid)
+
     async def get_article(self, uuid: str) -> GetArticle | None:
-        target = await self.__article_rep.get_article_by_uuid(uuid)
+        target = await self.__article_rep.get_full_article_by_uuid(uuid)
         if target is None:
             return None
         return GetArticle.model_validate(target, from_attributes=True)
 
     async def get_article_by_search(self, search_field: str, count: int) -> list[GetLiteArticle]:
         article_entity = await self.__article_rep.get_article_by_search(search_field, count)
-        articles = [GetLiteArticle.model_validate(entity, from_attributes=True) for entity in article_entity]
+        articles = lite_article_list.validate_python(article_entity, from_attributes=True)
         return articles
 
     async def delete_article(self, uuid_article: str):
-        target = await self.__article_rep.get_article_by_uuid(uuid_article)
-        await self.__article_rep.delete(target)
+        uuid_article = str(UUID(uuid_article))
+        await self.__article_rep.delete_list([uuid_article])
+        count_cache.invalidate("article")
+        await response_cache.invalidate("article", f"article:{uuid_article}")
+
+    async def delete_article_list(self, uuid_articles: str):
+        uuid_list = list(dict.fromkeys(str(UUID(i)) for i in uuid_articles.split(",")))
+        await self.__article_rep.delete_list(uuid_list)
+        count_cache.invalidate("article")
+        await response_cache.invalidate("article", *[f"article:{uuid}" for uuid in uuid_list])
 
     async def update_article(self, uuid_article: str, target: UpdateArticle):
         entity = await self.__article_rep.get_article_by_uuid(uuid_article)
-        entity.tags = []
-        await self.__article_rep.update(entity)
-
-        tags = await self.__env_repo.get_tags_by_id_set(target.tags)
-
         article_dict = target.model_dump()
 
         for key in article_dict:
             if key == "description":
                 setattr(entity, key, article_dict[key].encode())
-            elif key == "tags":
-                entity.tags = tags
-            else:
+            elif key != "tags":
                 setattr(entity, key, article_dict[key])
 
         try:
-            await self.__article_rep.update(entity)
+            await self.__article_rep.update_with_tags(entity, target.tags)
         except Exception:
             raise Exception
+        count_cache.invalidate("article")
+        await response_cache.invalidate("article", f"article:{uuid_article}")
 
     async def get_commentary(self, uuid: str) -> list[GetCommentary] | None:
         target = await self.__article_rep.get_all_comment_by_article(uuid)
@@ -110,9 +192,31 @@ class ArticleService:
             return None
         return [GetCommentary.model_validate(i, from_attributes=True) for i in target]
 
+    async def get_commentary_by_cursor(self, uuid: str, cursor: str) -> tuple[list[GetLiteCommentary], str | None]:
+        after = decode_cursor(cursor) if cursor else None
+        target = await self.__article_rep.get_comment_by_article_after(uuid, after, self.__count_item)
+        next_cursor = None
+        if len(target) == self.__count_item:
+            last = target[-1]
+            next_cursor = encode_cursor(last.date_publications, last.id)
+        comments = [GetLiteCommentary(
+            uuid=i.uuid,
+            content=i.content,
+            date_publications=i.date_publications,
+            user=GetCommentAuthor(
+                uuid=i.uuid_user,
+                name=i.name,
+                surname=i.surname,
+                icon=i.icon
+            )
+        ) for i in target]
+        return comments, next_cursor
+
     async def get_like_info(self, uuid_article: str, uuid_user: str) -> LikeInfo | None:
         if uuid_user == "no":
-            target = len(await self.__article_rep.get_all_like_by_article(uuid_article))
+            target = await self.__article_rep.get_likes_count(uuid_article)
+            if target is None:
+                return None
             t = LikeInfo(
                 count=target,
                 youLike=False
@@ -126,15 +230,44 @@ class ArticleService:
                 count=target["likes_count"],
                 youLike=target["user_liked"]
             )
-            return t
+            return self.__apply_pending_like(t, uuid_article, uuid_user)
+
+    def __apply_pending_like(self, target: LikeInfo, uuid_article: str, uuid_user: str | None) -> LikeInfo:
+        if uuid_user is None:
+            return target
+        like = like_buffer.get_state(uuid_article, uuid_user)
+        if like is not None and like != target.youLike:
+            target.count += 1 if like else -1
+            target.youLike = like
+        return target
+
+    async def get_like_info_list(self, uuid_articles: str, uuid_user: str | None) -> list[ArticleLikeInfo]:
+        uuid_list = list(dict.fromkeys(str(UUID(i)) for i in uuid_articles.split(",")))
+        if len(uuid_list) > self.__count_item:
+            raise ValueError("too many articles")
+        if uuid_user == "no":
+            uuid_user = None
+        if uuid_user is not None:
+            uuid_user = str(UUID(uuid_user))
+        target = await self.__article_rep.get_like_info_by_uuid_list(uuid_list, uuid_user)
+        return [self.__apply_pending_like(ArticleLikeInfo(uuid=uuid, count=count, youLike=you_like), str(uuid), uuid_user)
+                for uuid, count, you_like in target]
 
     async def add_like(self, uuid_article: str, uuid_user: str):
+        if settings.like_write_behind:
+            like_buffer.toggle(uuid_article, uuid_user, True)
+            return
         article = await self.__article_rep.get_article_by_uuid(uuid_article)
         user = await self.__user_repo.get_user_by_uuid(uuid_user)
         await self.__article_rep.add_like(article.id, user.id)
+        await response_cache.invalidate(f"like:{uuid_article}")
 
     async def delete_like(self, uuid_article: str, uuid_user: str):
+        if settings.like_write_behind:
+            like_buffer.toggle(uuid_article, uuid_user, False)
+            return
         await self.__article_rep.delete_like(uuid_article, uuid_user)
+        await response_cache.invalidate(f"like:{uuid_article}")
 
     async def add_comment(self, uuid_article: str, uuid_user: str, target: PostComment):
         article = await self.__article_rep.get_article_by_uuid(uuid_article)
@@ -145,9 +278,12 @@ class ArticleService:
             content=target.content
         )
         await self.__article_rep.add_comment(comment)
+        await response_cache.invalidate(f"comment:{uuid_article}")
 
     async def delete_comment(self, uuid_comment: str):
-        await self.__article_rep.delete_comment(uuid_comment)
+        uuid_article = await self.__article_rep.delete_comment(uuid_comment)
+        if uuid_article is not None:
+            await response_cache.invalidate(f"comment:{uuid_article}")
 
     async def get_count_page_by_user(self, uuid_user: str) -> int:
         count_row = await self.__article_rep.count_row_by_user(uuid_user)
@@ -159,5 +295,5 @@ class ArticleService:
     async def get_page_event_by_user(self, uuid_user: str, num_page: int) -> list[GetLiteArticle]:
         start = (num_page - 1) * self.__count_item
         articles_entity = await self.__article_rep.get_limit_article_by_user(uuid_user, start, self.__count_item)
-        articles = [GetLiteArticle.model_validate(entity, from_attributes=True) for entity in articles_entity]
+        articles = lite_article_list.validate_python(articles_entity, from_attributes=True)
         return articles
\ No newline at end of file
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from sqlalchemy import select, func, text
+
+from ..database import async_session, engine
+from ..repositories import EventRepository
+from ..response_cache import response_cache
+from ..settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventScheduler:
+    def __init__(self, interval: float, lock_id: int):
+        self.__interval: float = interval
+        self.__lock_id: int = lock_id
+        self.__task: asyncio.Task | None = None
+
+    async def update_state(self) -> int:
+        async with async_session() as session:
+            try:
+                uuid_list = await EventRepository(session).update_state_by_date()
+            finally:
+                await session.close()
+        if len(uuid_list) > 0:
+            await response_cache.invalidate("event", *[f"event:{i}" for i in uuid_list])
+        return len(uuid_list)
+
+    async def __release(self, connection):
+        try:
+            await connection.rollback()
+            await connection.execute(select(func.pg_advisory_unlock(self.__lock_id)))
+            await connection.commit()
+        except Exception:
+            logger.exception("failed to release scheduler lock, dropping the connection")
+            await connection.invalidate()
+
+    async def __run(self):
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    result = await connection.execute(select(func.pg_try_advisory_lock(self.__lock_id)))
+                    is_leader = result.scalar()
+                    await connection.commit()
+                    try:
+                        while is_leader:
+                            await self.update_state()
+                            await asyncio.sleep(self.__interval)
+                            await connection.execute(text("SELECT 1"))
+                            await connection.commit()
+                    finally:
+                        if is_leader:
+                            await self.__release(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("event scheduler tick failed")
+            await asyncio.sleep(self.__interval)
+
+    def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+
+event_scheduler = EventScheduler(settings.scheduler_interval, settings.scheduler_lock_id)
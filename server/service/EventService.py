@@ -4,7 +4,24 @@ from ..repositories import EventRepository, UserRepository, EnvRepository
 from ..models.User import UserGet
 from ..models.Event import *
 from ..tables import Event
+from ..pagination import encode_cursor, decode_cursor
+from ..database import async_session
+from ..ics import calendar_begin, calendar_end, format_event
+from ..count_cache import count_cache, filter_key
+from ..response_cache import response_cache
+from ..settings import settings
+from ..serialization import lite_event_list, user_list
+from .WaitListPromoter import wait_list_promoter
 from datetime import datetime
+from uuid import UUID, uuid4
+from io import StringIO
+from tempfile import TemporaryFile
+from starlette.concurrency import run_in_threadpool
+import csv
+import re
+
+
+SIGNED_NUMBER = re.compile(r"[+-][\d\s().-]*")
 
 
 class EventService:
@@ -17,6 +34,9 @@ class EventService:
         self.__env_repo: EnvRepository = env_rep
         #self.__file_repo: FileBucketRepository = FileBucketRepository("user")
         self.__count_item: int = 20
+        self.__count_chunk: int = 500
+        self.__export_header: list[str] = ["uuid_event", "event", "uuid_user", "surname", "name",
+                                           "patronymic", "email", "phone", "city", "birth_date"]
 
     @property
     def count_item(self) -> int:
@@ -26,12 +46,25 @@ class EventService:
     def count_item(self, item):
         self.__count_item = item
 
+    async def __get_cached_count_row(self, tags_list: list[int] | None, city: int | None) -> int | None:
+        key = filter_key(tags_list, city)
+        count_row = count_cache.get("event", key)
+        if count_row is None and settings.count_approximate and tags_list is None and city is None:
+            estimate = await self.__event_rep.estimate_count_row()
+            if estimate >= settings.count_approximate_threshold:
+                count_row = estimate
+                count_cache.set("event", key, count_row)
+        return count_row
+
     async def get_count_page(self, tags: str | None, city: int | None) -> int:
         tags_list = tags
         if tags is not None:
             tags_list = list(map(int, tags.split(",")))
 
-        count_row = await self.__event_rep.count_row(tags_list, city)
+        count_row = await self.__get_cached_count_row(tags_list, city)
+        if count_row is None:
+            count_row = await self.__event_rep.count_row(tags_list, city)
+            count_cache.set("event", filter_key(tags_list, city), count_row)
         sub_page = 0
         if count_row % self.__count_item > 0:
             sub_page += 1
@@ -49,17 +82,72 @@ class EventService:
             description_lite=target.description_lite,
             name=target.name,
             description=target.description.encode("utf-8"),
+            capacity=target.capacity,
             id_state=state.id
 
         )
         entity.tags.extend(tags)
         await self.__event_rep.add(entity)
+        count_cache.invalidate("event")
+        await response_cache.invalidate("event")
         return entity
 
     async def get_state_event(self) -> list[GetState]:
         target = await self.__event_rep.get_all_state_event()
         return [GetState.model_validate(i, from_attributes=True) for i in target]
 
+    async def get_facets(self, tags: str | None, city: int | None) -> EventFacets:
+        tags_list = tags
+        if tags is not None:
+            tags_list = list(map(int, tags.split(",")))
+
+        facets = await self.__event_rep.get_facets(tags_list, city)
+        count_cache.set("event", filter_key(tags_list, city), facets["count"])
+        return EventFacets(
+            count=facets["count"],
+            cities=sorted(facets["cities"], key=lambda i: -i["count"]),
+            tags=sorted(facets["tags"], key=lambda i: -i["count"])
+        )
+
+    async def get_page_with_count(self,
+                                  num_page: int,
+                                  tags: str | None,
+                                  city: int | None) -> tuple[list[GetLiteEvent], int]:
+        tags_list = tags
+        if tags is not None:
+            tags_list = list(map(int, tags.split(",")))
+
+        start = (num_page - 1) * self.__count_item
+        count_row = await self.__get_cached_count_row(tags_list, city)
+        if count_row is None:
+            events_entity, count_row = await self.__event_rep.get_limit_event_with_count(start, self.__count_item, tags_list, city)
+            count_cache.set("event", filter_key(tags_list, city), count_row)
+        else:
+            events_entity = await self.__event_rep.get_limit_event(start, self.__count_item, tags_list, city)
+        sub_page = 0
+        if count_row % self.__count_item > 0:
+            sub_page += 1
+        events = lite_event_list.validate_python(events_entity, from_attributes=True)
+        return events, count_row // self.__count_item + sub_page
+
+    async def get_range_event(self,
+                              date_from: datetime,
+                              date_to: datetime,
+                              city: int | None,
+                              cursor: str) -> tuple[list[GetLiteEvent], str | None]:
+        after = decode_cursor(cursor) if cursor else None
+        events_entity = await self.__event_rep.get_limit_event_by_range(date_from,
+                                                                        date_to,
+                                                                        city,
+                                                                        after,
+                                                                        self.__count_item)
+        next_cursor = None
+        if len(events_entity) == self.__count_item:
+            last = events_entity[-1]
+            next_cursor = encode_cursor(last.date_conducting, last.id)
+        events = lite_event_list.validate_python(events_entity, from_attributes=True)
+        return events, next_cursor
+
     async def get_page_event(self,
                              num_page: int,
                              tags: str | None,
@@ -70,77 +158,179 @@ class EventService:
 
         start = (num_page - 1) * self.__count_item
         events_entity = await self.__event_rep.get_limit_event(start, self.__count_item, tags_list, city)
-        events = [GetLiteEvent.model_validate(entity, from_attributes=True) for entity in events_entity]
+        events = lite_event_list.validate_python(events_entity, from_attributes=True)
         return events
 
+    async def get_event_version(self, uuid: str) -> int | None:
+        return await self.__event_rep.get_version_by_uuid(uuid)
+
     async def get_event(self, uuid: str) -> GetEvent | None:
-        target = await self.__event_rep.get_event_by_uuid(uuid)
+        target = await self.__event_rep.get_full_event_by_uuid(uuid)
         if target is None:
             return None
         return GetEvent.model_validate(target, from_attributes=True)
 
-    async def get_event_by_search(self, search_field: str, count: int) -> list[GetLiteEvent]:
-        events_entity = await self.__event_rep.get_event_by_search(search_field, count)
-        events = [GetLiteEvent.model_validate(entity, from_attributes=True) for entity in events_entity]
+    async def get_event_by_search(self,
+                                  search_field: str,
+                                  count: int,
+                                  city: int | None = None,
+                                  date_from: datetime | None = None,
+                                  date_to: datetime | None = None) -> list[GetLiteEvent]:
+        events_entity = await self.__event_rep.get_event_by_search(search_field, count, city, date_from, date_to)
+        events = lite_event_list.validate_python(events_entity, from_attributes=True)
         return events
 
     async def delete_event(self, uuid_event: str):
         target = await self.__event_rep.get_event_by_uuid(uuid_event)
-        target.tags = []
-        target.users = []
-        await self.__event_rep.update(target)
         await self.__event_rep.delete(target)
+        count_cache.invalidate("event")
+        await response_cache.invalidate("event", f"event:{uuid_event}")
 
     async def update_event(self, uuid_event: str, target: UpdateEvent):
         entity = await self.__event_rep.get_event_by_uuid(uuid_event)
-        entity.tags = []
-        await self.__event_rep.update(entity)
-
-        tags = await self.__env_repo.get_tags_by_id_set(target.tags)
-
         event_dict = target.model_dump()
 
         for key in event_dict:
             if key == "description":
                 setattr(entity, key, event_dict[key].encode())
-            elif key == "tags":
-                entity.tags = tags
-            else:
+            elif key != "tags":
                 setattr(entity, key, event_dict[key])
 
         try:
-            await self.__event_rep.update(entity)
+            await self.__event_rep.update_with_tags(entity, target.tags)
         except Exception:
             raise Exception
+        count_cache.invalidate("event")
+        await response_cache.invalidate("event", f"event:{uuid_event}")
 
-    async def get_user_registration_info(self, uuid_event: str, uuid_user: str) -> UserRegInfo | None:
+    async def get_user_registration_info(self, uuid_event: str, uuid_user: str | None) -> UserRegInfo | None:
         if uuid_user == "no":
-            t = await self.__event_rep.get_event_by_uuid(uuid_event)
-            target = len(t.users)
-            t = UserRegInfo(
-                count=target,
-                youLike=False
-            )
-            return t
-        else:
-            target = await self.__event_rep.get_user_reg_info_by_uuid(uuid_event, uuid_user)
-            if target is None:
-                return None
-            t = UserRegInfo(
-                count=target["user_count"],
-                youReg=target["is_user"]
-            )
-            return t
-
-    async def add_user_reg(self, uuid_event: str, uuid_user: str):
+            uuid_user = None
+        target = await self.__event_rep.get_user_reg_info_by_uuid(uuid_event, uuid_user)
+        if target is None:
+            return None
+        return UserRegInfo(
+            count=target["user_count"],
+            capacity=target["capacity"],
+            youReg=target["is_user"],
+            youWait=target["is_wait"]
+        )
+
+    async def add_user_reg(self, uuid_event: str, uuid_user: str) -> str:
         event = await self.__event_rep.get_event_by_uuid(uuid_event)
         user = await self.__user_repo.get_user_by_uuid(uuid_user)
-        await self.__event_rep.add_user_reg(event.id, user.id)
+        return await self.__event_rep.add_user_reg(event.id, user.id)
 
-    async def delete_user_reg(self, uuid_event: str, uuid_user: str) -> list[UserGet]:
+    async def delete_user_reg(self, uuid_event: str, uuid_user: str):
         await self.__event_rep.delete_user_reg(uuid_event, uuid_user)
-        event = await self.__event_rep.get_event_by_uuid(uuid_event)
-        return [UserGet.model_validate(i, from_attributes=True) for i in event.users]
+        wait_list_promoter.notify()
+
+    async def get_count_page_user_reg(self, uuid_event: str) -> int:
+        count_row = await self.__event_rep.count_user_reg(uuid_event)
+        sub_page = 0
+        if count_row % self.__count_item > 0:
+            sub_page += 1
+        return count_row // self.__count_item + sub_page
+
+    async def get_page_user_reg(self, uuid_event: str, num_page: int) -> list[UserGet]:
+        start = (num_page - 1) * self.__count_item
+        users_entity = await self.__event_rep.get_limit_user_reg(uuid_event, start, self.__count_item)
+        return user_list.validate_python(users_entity, from_attributes=True)
+
+    async def get_calendar_stamp(self, city: int | None, uuid_user: str | None) -> tuple[int, int, datetime | None]:
+        return await self.__event_rep.get_calendar_stamp(city, uuid_user)
+
+    async def get_calendar_token(self, user: UserGet, rotate: bool = False) -> CalendarToken:
+        entity = await self.__user_repo.get_user_by_uuid(str(user.uuid))
+        if entity.calendar_token is None or rotate:
+            entity.calendar_token = uuid4()
+            await self.__user_repo.update(entity)
+        return CalendarToken(token=str(entity.calendar_token))
+
+    async def get_uuid_user_by_calendar_token(self, token: str) -> str | None:
+        try:
+            token = str(UUID(token))
+        except ValueError:
+            return None
+        entity = await self.__user_repo.get_user_by_calendar_token(token)
+        if entity is None:
+            return None
+        return str(entity.uuid)
+
+    async def stream_calendar(self, name: str, city: int | None, uuid_user: str | None):
+        async with async_session() as session:
+            try:
+                result = await EventRepository(session).stream_calendar(city, uuid_user, self.__count_chunk)
+                yield calendar_begin(name)
+                async for rows in result.partitions():
+                    yield b"".join(format_event(*row) for row in rows)
+                yield calendar_end()
+            finally:
+                await session.close()
+
+    def export_user_reg(self, uuid_events: str, file_format: str):
+        uuid_list = [str(UUID(i)) for i in uuid_events.split(",")]
+        if file_format == "xlsx":
+            from xlsxwriter import Workbook
+            return self.__export_user_reg_xlsx(uuid_list, Workbook)
+        return self.__export_user_reg_csv(uuid_list)
+
+    async def __stream_user_reg(self, uuid_list: list[str]):
+        async with async_session() as session:
+            try:
+                result = await EventRepository(session).stream_user_reg(uuid_list, self.__count_chunk)
+                async for rows in result.partitions():
+                    yield rows
+            finally:
+                await session.close()
+
+    @staticmethod
+    def __export_cell(value, escape: bool) -> str:
+        if value is None:
+            return ""
+        value = str(value)
+        if not escape:
+            return value
+        if value.startswith(("=", "@", "\t", "\r")):
+            return "'" + value
+        if value.startswith(("+", "-")) and SIGNED_NUMBER.fullmatch(value) is None:
+            return "'" + value
+        return value
+
+    @classmethod
+    def __write_xlsx_rows(cls, sheet, num_row: int, rows) -> int:
+        for row in rows:
+            for num_col, value in enumerate(row):
+                sheet.write_string(num_row, num_col, cls.__export_cell(value, False))
+            num_row += 1
+        return num_row
+
+    async def __export_user_reg_csv(self, uuid_list: list[str]):
+        buffer = StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+        writer.writerow(self.__export_header)
+        yield buffer.getvalue().encode("utf-8-sig")
+        async for rows in self.__stream_user_reg(uuid_list):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([self.__export_cell(i, True) for i in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+
+    async def __export_user_reg_xlsx(self, uuid_list: list[str], workbook_class):
+        with TemporaryFile() as file:
+            workbook = workbook_class(file, {"constant_memory": True, "remove_timezone": True})
+            sheet = workbook.add_worksheet()
+            sheet.write_row(0, 0, self.__export_header)
+            num_row = 1
+            async for rows in self.__stream_user_reg(uuid_list):
+                num_row = await run_in_threadpool(self.__write_xlsx_rows, sheet, num_row, rows)
+            await run_in_threadpool(workbook.close)
+            file.seek(0)
+            while True:
+                data = await run_in_threadpool(file.read, 64 * 1024)
+                if not data:
+                    break
+                yield data
 
     async def get_count_page_by_user(self, uuid_user: str) -> int:
         count_row = await self.__event_rep.count_row_by_user(uuid_user)
@@ -152,5 +342,5 @@ class EventService:
     async def get_page_event_by_user(self, uuid_user: str, num_page: int) -> list[GetLiteEvent]:
         start = (num_page - 1) * self.__count_item
         events_entity = await self.__event_rep.get_limit_event_by_user(uuid_user, start, self.__count_item)
-        events = [GetLiteEvent.model_validate(entity, from_attributes=True) for entity in events_entity]
+        events = lite_event_list.validate_python(events_entity, from_attributes=True)
         return events
@@ -0,0 +1,117 @@
+from contextlib import suppress
+from uuid import UUID
+import asyncio
+import logging
+
+from ..database import async_session
+from ..repositories import ArticleRepository
+from ..response_cache import response_cache
+from ..settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBuffer:
+    def __init__(self, interval: float, max_attempts: int = 3):
+        self.__interval: float = interval
+        self.__max_attempts: int = max_attempts
+        self.__pending: dict[tuple[str, str], bool] = {}
+        self.__flushing: dict[tuple[str, str], bool] = {}
+        self.__attempts: dict[tuple[str, str], int] = {}
+        self.__task: asyncio.Task | None = None
+
+    def toggle(self, uuid_article: str, uuid_user: str, like: bool):
+        key = (str(UUID(str(uuid_article))), str(UUID(str(uuid_user))))
+        self.__pending[key] = like
+        self.__attempts.pop(key, None)
+
+    def get_state(self, uuid_article: str, uuid_user: str) -> bool | None:
+        try:
+            key = (str(UUID(str(uuid_article))), str(UUID(str(uuid_user))))
+        except ValueError:
+            return None
+        if key in self.__pending:
+            return self.__pending[key]
+        return self.__flushing.get(key)
+
+    async def __apply(self, items: dict[tuple[str, str], bool]):
+        likes = [key for key, like in items.items() if like]
+        unlikes = [key for key, like in items.items() if not like]
+        async with async_session() as session:
+            try:
+                await ArticleRepository(session).apply_likes(likes, unlikes)
+            finally:
+                await session.close()
+
+    def __requeue(self, key: tuple[str, str], like: bool, count_attempt: bool):
+        attempts = self.__attempts.get(key, 0)
+        if count_attempt or attempts > 0:
+            attempts += 1
+        if attempts >= self.__max_attempts:
+            self.__attempts.pop(key, None)
+            logger.error("dropping like toggle %s after %s failed flushes", key, attempts)
+            return
+        if key not in self.__pending:
+            self.__pending[key] = like
+            self.__attempts[key] = attempts
+
+    async def flush(self):
+        if len(self.__pending) == 0:
+            return
+        self.__flushing, self.__pending = self.__pending, {}
+        applied = {}
+        try:
+            try:
+                await self.__apply(self.__flushing)
+                applied = dict(self.__flushing)
+            except Exception:
+                logger.exception("like batch flush failed, retrying toggles one by one")
+                failed = {}
+                for key, like in self.__flushing.items():
+                    try:
+                        await self.__apply({key: like})
+                        applied[key] = like
+                    except Exception:
+                        failed[key] = like
+                # if nothing went through the database is likely down, so only keys that already failed alone are counted
+                for key, like in failed.items():
+                    self.__requeue(key, like, len(applied) > 0)
+        except asyncio.CancelledError:
+            # writes are idempotent, so the interrupted batch goes back for the final flush
+            for key, like in self.__flushing.items():
+                if key not in applied:
+                    self.__pending.setdefault(key, like)
+            raise
+        finally:
+            self.__flushing = {}
+        for key in applied:
+            self.__attempts.pop(key, None)
+        if len(applied) > 0:
+            try:
+                await response_cache.invalidate(*{f"like:{uuid_article}" for uuid_article, _ in applied})
+            except Exception:
+                logger.exception("like cache invalidation failed")
+
+    async def __run(self):
+        while True:
+            await asyncio.sleep(self.__interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("like flush failed")
+
+    def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.__task
+            self.__task = None
+        await self.flush()
+
+
+like_buffer = LikeBuffer(settings.like_flush_interval)
@@ -8,6 +8,7 @@ from ..models.User import UserGet, TypeUser, UserPost
 from ..models.UserLogin import UserLogin, Token, UserSigIn
 from ..settings import settings
 from ..tables import User
+from ..count_cache import count_cache
 from datetime import datetime, timedelta
 
 oauth2_cheme = OAuth2PasswordBearer(tokenUrl='/v1/login/sign-in/')
@@ -118,6 +119,7 @@ class LoginServices:
             await self.__repo.add(entity)
         except Exception:
             raise Exception
+        count_cache.invalidate("user")
 
         token = self.create_token(entity)
         return token
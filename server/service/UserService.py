@@ -3,7 +3,8 @@ from fastapi import Depends, UploadFile
 from ..repositories import UserRepository, FileBucketRepository
 from ..models.User import *
 from ..tables import User
-
+from ..count_cache import count_cache
+from ..serialization import user_list
 
 
 class UserService:
@@ -21,7 +22,10 @@ class UserService:
         self.__count_item = item
 
     async def get_count_page(self) -> int:
-        count_row = await self.__user_repo.count_row()
+        count_row = count_cache.get("user", ())
+        if count_row is None:
+            count_row = await self.__user_repo.count_row()
+            count_cache.set("user", (), count_row)
         sub_page = 0
         if count_row % self.__count_item > 0:
             sub_page += 1
@@ -30,7 +34,7 @@ class UserService:
     async def get_page_user(self, num_page: int) -> list[UserGet]:
         start = (num_page - 1) * self.__count_item
         users_entity = await self.__user_repo.get_limit_user(start, self.__count_item)
-        users = [UserGet.model_validate(entity, from_attributes=True) for entity in users_entity]
+        users = user_list.validate_python(users_entity, from_attributes=True)
         return users
 
     async def create_user(self, user: UserPost):
@@ -47,6 +51,7 @@ class UserService:
             await self.__user_repo.add(entity)
         except Exception:
             raise Exception
+        count_cache.invalidate("user")
 
     async def get_type_users(self) -> list[GetTypeUser]:
         type_users = await self.__user_repo.get_all_type_user()
@@ -73,9 +78,15 @@ class UserService:
             patronymic,
             count
         )
-        users = [UserGet.model_validate(entity, from_attributes=True) for entity in users_entity]
+        users = user_list.validate_python(users_entity, from_attributes=True)
         return users
 
+    async def get_users_by_autocomplete(self, search_field: str, count: int) -> list[UserGet]:
+        if len(search_field.strip()) == 0:
+            return []
+        users_entity = await self.__user_repo.get_users_by_autocomplete(search_field, count)
+        return user_list.validate_python(users_entity, from_attributes=True)
+
     async def update_user(self, uuid: str, user: UserUpdate):
         entity = await self.__user_repo.get_user_by_uuid(uuid)
 
@@ -97,6 +108,7 @@ class UserService:
 
     async def delete_user(self, uuid: str):
         await self.__user_repo.delete(uuid)
+        count_cache.invalidate("user")
 
     async def update_password(self, uuid_user: str, target: PasswordUpdate):
         user = await self.__user_repo.get_user_by_uuid(uuid_user)
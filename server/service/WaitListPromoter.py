@@ -0,0 +1,57 @@
+import asyncio
+import logging
+
+from ..database import async_session
+from ..repositories import EventRepository
+from ..settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class WaitListPromoter:
+    def __init__(self, interval: float, count_event: int):
+        self.__interval: float = interval
+        self.__count_event: int = count_event
+        self.__wake: asyncio.Event = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    def notify(self):
+        self.__wake.set()
+
+    async def promote(self) -> int:
+        promoted = 0
+        async with async_session() as session:
+            try:
+                repo = EventRepository(session)
+                while True:
+                    count = await repo.promote_wait_list(self.__count_event)
+                    promoted += count
+                    if count == 0:
+                        break
+            except Exception:
+                logger.exception("wait list promotion failed")
+            finally:
+                await session.close()
+        return promoted
+
+    async def __run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.__wake.wait(), self.__interval)
+            except asyncio.TimeoutError:
+                pass
+            self.__wake.clear()
+            await self.promote()
+
+    def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+
+wait_list_promoter = WaitListPromoter(settings.wait_list_interval, settings.wait_list_batch)
@@ -4,3 +4,6 @@ from .EnvService import EnvService
 from .ArticleService import ArticleService
 from .EventService import EventService
 from .CalendarService import CalendarService
+from .LikeBuffer import LikeBuffer, like_buffer
+from .WaitListPromoter import WaitListPromoter, wait_list_promoter
+from .EventScheduler import EventScheduler, event_scheduler
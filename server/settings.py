@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 import os
@@ -35,7 +36,44 @@ class Settings(BaseSettings):
     minio_access_key: str
     minio_secret_key: str
 
+    count_cache_ttl: int = 60
+    count_approximate: bool = False
+    count_approximate_threshold: int = 100000
+
+    web_concurrency: int = 1
+
+    like_write_behind: bool = False
+    like_flush_interval: float = 1.0
+
+    wait_list_interval: float = 5.0
+    wait_list_batch: int = 100
+
+    scheduler_interval: float = 60.0
+    scheduler_lock_id: int = 7264019
+
+    cache_backend: str = "none"
+    cache_max_size: int = 64 * 1024 * 1024
+    cache_ttl: int = 300
+    redis_url: str | None = None
+
+    fast_serialization: bool = False
+
     root_path: str = os.path.dirname(os.path.abspath(__file__))
 
+    @model_validator(mode="after")
+    def check_like_write_behind(self):
+        if self.like_write_behind and self.web_concurrency > 1:
+            raise ValueError("like_write_behind keeps pending likes in process memory "
+                             "and requires web_concurrency=1")
+        return self
+
+    @model_validator(mode="after")
+    def check_cache_backend(self):
+        if self.cache_backend not in ["none", "memory", "redis"]:
+            raise ValueError("cache_backend must be one of none, memory, redis")
+        if self.cache_backend == "redis" and not self.redis_url:
+            raise ValueError("cache_backend=redis requires redis_url")
+        return self
+
 
 settings = Settings(_env_file='./.env-test', _env_file_encoding='utf-8')
\ No newline at end of file
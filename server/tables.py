@@ -8,16 +8,20 @@ from sqlalchemy import (
     Boolean,
     Float,
     Date,
-    LargeBinary
+    LargeBinary,
+    Index,
+    UniqueConstraint,
+    Computed,
+    func
 )
 
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID, TSVECTOR
 from uuid import uuid4
 from datetime import datetime
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.mutable import MutableDict
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
@@ -82,6 +86,21 @@ class User(base):
 
     is_deleted = Column(Boolean, nullable=True, default=False)
 
+    calendar_token = Column(UUID(as_uuid=True), nullable=True, unique=True)
+
+    full_name = Column(Text, Computed(
+        "lower(coalesce(surname, '') || ' ' || coalesce(name, '') || ' ' || coalesce(patronymic, ''))",
+        persisted=True
+    ))
+
+    __table_args__ = (
+        Index("ix_user_full_name_trgm", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_user_email_pattern", func.lower(email).label("email_lower"),
+              postgresql_ops={"email_lower": "text_pattern_ops"}),
+        Index("ix_user_phone_pattern", "phone", postgresql_ops={"phone": "text_pattern_ops"}),
+    )
+
     @property
     def password(self):
         return self.password_hash
@@ -119,8 +138,19 @@ class Article(base):
 
     name = Column(String(255), nullable=False)
     description_lite = Column(Text, nullable=False, server_default=str(""))
-    description = Column(LargeBinary, nullable=True, default=b'')
-    tags = relationship(Tag, secondary="tag_article", lazy="joined")
+    description = deferred(Column(LargeBinary, nullable=True, default=b''))
+    tags = relationship(Tag, secondary="tag_article", lazy="selectin")
+
+    likes_count = Column(Integer, nullable=False, server_default="0", default=0)
+    version = Column(Integer, nullable=False, server_default="1", default=1)
+
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+
+    __table_args__ = (
+        Index("ix_article_date_publications_id", "date_publications", "id"),
+        Index("ix_article_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_article_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
 
 class Comment(base):
@@ -131,10 +161,14 @@ class Comment(base):
     user = relationship("User", lazy="joined")
 
     id_article = Column(Integer, ForeignKey("article.id"))
-    article = relationship("Article", lazy="joined")
-    date_publications = Column(DateTime(), nullable=True, default=datetime.now)
+    article = relationship("Article", lazy="raise")
+    date_publications = Column(DateTime(), nullable=False, default=datetime.now)
     content = Column(String, nullable=False)
 
+    __table_args__ = (
+        Index("ix_comment_id_article_date_publications", "id_article", "date_publications", "id"),
+    )
+
 
 class Like(base):
     __tablename__ = "like"
@@ -160,13 +194,31 @@ class Event(base):
     address = Column(String(255), nullable=False)
     name = Column(String(255), nullable=False)
     description_lite = Column(Text, nullable=False, server_default=str(""))
-    description = Column(LargeBinary, nullable=True, default=b'')
+    description = deferred(Column(LargeBinary, nullable=True, default=b''))
 
     id_state = Column(Integer, ForeignKey("state_event.id"))
     state = relationship("StateEvent", lazy="joined")
 
-    tags = relationship(Tag, secondary="tag_event", lazy="joined")
-    users = relationship(User, secondary="user_to_event", lazy="joined")
+    tags = relationship(Tag, secondary="tag_event", lazy="selectin")
+    users = relationship(User, secondary="user_to_event", lazy="raise")
+
+    capacity = Column(Integer, nullable=True)
+    count_reg = Column(Integer, nullable=False, server_default="0", default=0)
+
+    version = Column(Integer, nullable=False, server_default="1", default=1)
+    date_update = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_event_date_conducting_id", "date_conducting", "id"),
+        Index("ix_event_id_city_date_conducting_id", "id_city", "date_conducting", "id"),
+        Index("ix_event_date_stop", "date_stop"),
+        Index("ix_event_date_update", "date_update"),
+        Index("ix_event_duration", (date_stop - date_conducting).label("duration")),
+        Index("ix_event_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_event_address_trgm", "address", postgresql_using="gin", postgresql_ops={"address": "gin_trgm_ops"}),
+        Index("ix_event_description_lite_trgm", "description_lite", postgresql_using="gin",
+              postgresql_ops={"description_lite": "gin_trgm_ops"}),
+    )
 
 
 class UserToEvent(base):
@@ -174,6 +226,23 @@ class UserToEvent(base):
     id_user = Column(ForeignKey("user.id"), primary_key=True)
     id_event = Column(ForeignKey("event.id"), primary_key=True)
 
+    __table_args__ = (
+        Index("ix_user_to_event_id_event_id_user", "id_event", "id_user"),
+    )
+
+
+class WaitList(base):
+    __tablename__ = "wait_list"
+    id = Column(Integer, autoincrement=True, primary_key=True)
+    id_event = Column(Integer, ForeignKey("event.id"), nullable=False)
+    id_user = Column(Integer, ForeignKey("user.id"), nullable=False)
+    date_created = Column(DateTime(timezone=True), nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint("id_event", "id_user"),
+        Index("ix_wait_list_id_event_id", "id_event", "id"),
+    )
+
 
 class TagEvent(base):
     __tablename__ = "tag_event"
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, text
+
+from server.main import app
+from server.database import engine, async_session
+from server.tables import (User,
+                           TypeUser,
+                           TypeArticle,
+                           Tag,
+                           City,
+                           StateEvent,
+                           Article,
+                           TagArticle,
+                           Comment,
+                           Event,
+                           TagEvent,
+                           UserToEvent)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def data():
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception:
+        pytest.skip("database is not available")
+
+    suffix = uuid4().hex
+    async with async_session() as session:
+        type_user = TypeUser(name=f"test-{suffix}", description="")
+        type_article = TypeArticle(name=f"test-{suffix}", description="")
+        city = City(name=f"test-{suffix}", region="")
+        state = StateEvent(name=f"test-{suffix}", description="")
+        tags = [Tag(name=f"test-{suffix}-{i}", description="") for i in range(3)]
+        session.add_all([type_user, type_article, city, state, *tags])
+        await session.flush()
+
+        users = [User(email=f"test-{suffix}-{i}@mail.ru", id_type=type_user.id) for i in range(3)]
+        session.add_all(users)
+        await session.flush()
+
+        article = Article(id_autor=users[0].id,
+                          id_type=type_article.id,
+                          date_publications=datetime.now(),
+                          name="test",
+                          description_lite="",
+                          description=b"")
+        event_row = Event(date_conducting=datetime.now() + timedelta(days=1),
+                          date_stop=datetime.now() + timedelta(days=2),
+                          id_city=city.id,
+                          address="test",
+                          name="test",
+                          description_lite="",
+                          description=b"",
+                          id_state=state.id)
+        session.add_all([article, event_row])
+        await session.flush()
+
+        session.add_all([TagArticle(id_tag=i.id, id_article=article.id) for i in tags])
+        session.add_all([TagEvent(id_tag=i.id, id_event=event_row.id) for i in tags])
+        session.add_all([UserToEvent(id_user=i.id, id_event=event_row.id) for i in users])
+        session.add_all([Comment(id_user=i.id, id_article=article.id, content="test",
+                                 date_publications=datetime.now()) for i in users])
+        await session.commit()
+        ids = {
+            "type_user": type_user.id,
+            "type_article": type_article.id,
+            "city": city.id,
+            "state": state.id,
+            "tags": [i.id for i in tags],
+            "users": [i.id for i in users],
+            "article": article.id,
+            "article_uuid": str(article.uuid),
+            "event": event_row.id,
+            "event_uuid": str(event_row.uuid),
+        }
+
+    yield ids
+
+    async with async_session() as session:
+        await session.execute(delete(UserToEvent).where(UserToEvent.id_event == ids["event"]))
+        await session.execute(delete(TagEvent).where(TagEvent.id_event == ids["event"]))
+        await session.execute(delete(Event).where(Event.id == ids["event"]))
+        await session.execute(delete(Comment).where(Comment.id_article == ids["article"]))
+        await session.execute(delete(TagArticle).where(TagArticle.id_article == ids["article"]))
+        await session.execute(delete(Article).where(Article.id == ids["article"]))
+        await session.execute(delete(Tag).where(Tag.id.in_(ids["tags"])))
+        await session.execute(delete(User).where(User.id.in_(ids["users"])))
+        await session.execute(delete(City).where(City.id == ids["city"]))
+        await session.execute(delete(StateEvent).where(StateEvent.id == ids["state"]))
+        await session.execute(delete(TypeArticle).where(TypeArticle.id == ids["type_article"]))
+        await session.execute(delete(TypeUser).where(TypeUser.id == ids["type_user"]))
+        await session.commit()
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def client():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("tz", [timezone.utc, timezone(timedelta(hours=3))])
+async def test_range_with_aware_bounds(data, client, tz):
+    date_from = datetime.now(tz).replace(microsecond=0)
+    date_to = date_from + timedelta(days=3)
+    response = await client.get("/v1/event/range", params={
+        "date_from": date_from.isoformat().replace("+00:00", "Z"),
+        "date_to": date_to.isoformat(),
+        "city": data["city"],
+    })
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()] == [data["event_uuid"]]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_range_excludes_finished_events(data, client):
+    date_from = datetime.now(timezone.utc) + timedelta(days=3)
+    response = await client.get("/v1/event/range", params={
+        "date_from": date_from.isoformat(),
+        "date_to": (date_from + timedelta(days=1)).isoformat(),
+        "city": data["city"],
+    })
+    assert response.status_code == 200
+    assert response.json() == []
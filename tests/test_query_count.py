@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+import re
+
+import pytest
+from sqlalchemy import event
+
+from server.database import engine
+from server.tables import Article, Comment, Event
+
+
+COLLECTION_JOIN = re.compile(r"LEFT OUTER JOIN \(?\s*(tag_article|tag_event|user_to_event|comment|\"like\")\b")
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def assert_no_collection_join(statements: list[str]):
+    for statement in statements:
+        assert COLLECTION_JOIN.search(statement) is None, statement
+
+
+def test_collection_loading_strategy():
+    assert Article.tags.property.lazy == "selectin"
+    assert Event.tags.property.lazy == "selectin"
+    assert Event.users.property.lazy == "raise"
+    assert Comment.article.property.lazy == "raise"
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_event_get_one(data, client):
+    with count_statements() as statements:
+        response = await client.get(f"/v1/event/get_one/{data['event_uuid']}")
+    assert response.status_code == 200
+    assert len(response.json()["tags"]) == 3
+    # version check, event row, selectin tags
+    assert len(statements) <= 3, statements
+    assert_no_collection_join(statements)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_article_page(data, client):
+    with count_statements() as statements:
+        response = await client.get("/v1/article/page", params={"type_article": data["type_article"]})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert len(response.json()[0]["tags"]) == 3
+    # page with window count, selectin tags
+    assert len(statements) <= 2, statements
+    assert_no_collection_join(statements)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_article_commentary_page(data, client):
+    with count_statements() as statements:
+        response = await client.get(f"/v1/article/commentary/{data['article_uuid']}/page")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert len(statements) <= 1, statements
+    assert_no_collection_join(statements)